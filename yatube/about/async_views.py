@@ -0,0 +1,7 @@
+"""Асинхронные варианты статических страниц (для ASGI)."""
+from core.async_views import async_view
+
+from . import views
+
+author = async_view(views.AboutAuthorStaticPage.as_view())
+tech = async_view(views.AboutTechStaticPage.as_view())
@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'about'
 
+if settings.ASYNC_VIEWS:
+    author_view, tech_view = async_views.author, async_views.tech
+else:
+    author_view = views.AboutAuthorStaticPage.as_view()
+    tech_view = views.AboutTechStaticPage.as_view()
+
 urlpatterns = [
-    path('author/', views.AboutAuthorStaticPage.as_view(), name='author'),
-    path('tech/', views.AboutTechStaticPage.as_view(), name='tech'),
+    path('author/', author_view, name='author'),
+    path('tech/', tech_view, name='tech'),
 ]
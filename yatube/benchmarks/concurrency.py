@@ -0,0 +1,114 @@
+"""Чтение лент одновременно с публикацией постов.
+
+Несколько процессов читают первую страницу главной, один создаёт
+посты так же, как post_create (с сигналами, в транзакции). Замер
+повторяется для прагм SQLite разработки и production: в режиме
+журнала отката читатели ждут, пока писатель держит блокировку,
+в WAL - нет.
+"""
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import (OperationalError, connection, connections,
+                       transaction)
+from django.test.utils import override_settings
+
+from core.instrumentation import percentile
+from posts.models import Post
+from posts.views import POSTS_COUNT
+
+User = get_user_model()
+
+PROFILES = {
+    # journal_mode хранится в файле базы, поэтому задаётся явно
+    'development': {'journal_mode': 'DELETE'},
+    'production': settings.SQLITE_PRODUCTION_PRAGMAS,
+}
+
+
+def _reader(stop, results):
+    latencies, errors = [], 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            list(Post.objects.for_feed()[:POSTS_COUNT])
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    connections.close_all()
+    results.put(('read', latencies, errors))
+
+
+def _writer(stop, author_id, results):
+    writes, errors = 0, 0
+    while not stop.is_set():
+        try:
+            with transaction.atomic():
+                Post.objects.create(author_id=author_id, text='Пост из замера')
+        except OperationalError:
+            errors += 1
+            continue
+        writes += 1
+    connections.close_all()
+    results.put(('write', writes, errors))
+
+
+def run(pragmas, readers=4, seconds=5):
+    """Задержки чтения и число записей за seconds секунд.
+
+    Читатели и писатель - отдельные процессы, чтобы замер показывал
+    блокировки SQLite, а не борьбу потоков за GIL.
+    """
+    author_id = User.objects.order_by('pk').values_list('pk', flat=True)[0]
+    context = multiprocessing.get_context('fork')
+    stop = context.Event()
+    results = context.Queue()
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        # Дочерние процессы откроют свои соединения уже с нужными прагмами
+        connections.close_all()
+        workers = [
+            context.Process(target=_reader, args=(stop, results))
+            for _ in range(readers)
+        ]
+        workers.append(context.Process(
+            target=_writer, args=(stop, author_id, results)
+        ))
+        for worker in workers:
+            worker.start()
+        time.sleep(seconds)
+        stop.set()
+        collected = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        with connection.cursor() as cursor:
+            journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+        connections.close_all()
+
+    latencies, writes, errors = [], 0, {}
+    for kind, value, failed in collected:
+        if kind == 'read':
+            latencies.extend(value)
+        else:
+            writes += value
+        if failed:
+            errors[kind] = errors.get(kind, 0) + failed
+    return {
+        'journal_mode': journal_mode,
+        'reads_per_second': round(len(latencies) / seconds, 1),
+        'writes_per_second': round(writes / seconds, 1),
+        'read_p50_ms': round(percentile(latencies, 50), 2),
+        'read_p99_ms': round(percentile(latencies, 99), 2),
+        'read_max_ms': round(max(latencies), 2),
+        'reads_over_50ms': sum(latency > 50 for latency in latencies),
+        'errors': errors,
+    }
+
+
+def compare(readers=4, seconds=5):
+    return {
+        name: run(pragmas, readers, seconds)
+        for name, pragmas in PROFILES.items()
+    }
@@ -0,0 +1,123 @@
+"""Замер лент постов до и после индексов из posts.0005_post_feed_indexes.
+
+Скрипт создаёт временную SQLite-базу, заполняет её постами, а затем
+для index, group_posts и profile печатает EXPLAIN QUERY PLAN и время
+запросов первой страницы, глубокой страницы по номеру (?page=N)
+и той же глубины по курсору (?after=).
+
+Запуск из папки yatube:
+    python benchmarks/feed_indexes.py --posts 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+REPEAT = 20
+PER_PAGE = 10
+
+
+def measure(func):
+    """Среднее время вызова в миллисекундах и SQL последнего вызова."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+    elapsed = (time.perf_counter() - started) / REPEAT * 1000
+    return elapsed, [query['sql'] for query in queries.captured_queries]
+
+
+def explain(sql):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def feeds(author_id, group_id):
+    from posts.models import Post
+
+    return {
+        'index': Post.objects.for_feed(),
+        'group_posts': Post.objects.filter(group_id=group_id).for_feed(),
+        'profile': Post.objects.filter(author_id=author_id).for_feed(),
+    }
+
+
+def page_loaders(queryset, depth):
+    """Способы получить страницу ленты номер depth."""
+    from posts.paginator import KeysetPaginator, encode_cursor
+
+    paginator = KeysetPaginator(queryset, PER_PAGE)
+    deep_page = paginator.page(min(depth, paginator.num_pages))
+    cursor = encode_cursor(deep_page.object_list[0])
+    return {
+        'first page': lambda: list(paginator.get_keyset_page()),
+        f'?page={deep_page.number}': lambda: list(
+            paginator.page(deep_page.number)
+        ),
+        'cursor, same depth': lambda: list(
+            paginator.get_keyset_page(after=cursor)
+        ),
+    }
+
+
+def report(title, author_id, group_id, depth):
+    print(f'\n===== {title} =====')
+    for view, queryset in feeds(author_id, group_id).items():
+        for mode, load in page_loaders(queryset, depth).items():
+            elapsed, queries = measure(load)
+            print(f'\n{view} [{mode}]: {elapsed:.2f} ms')
+            for sql in queries:
+                for line in explain(sql):
+                    print(f'    {line}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=1000,
+                        help='номер глубокой страницы')
+    args = parser.parse_args()
+
+    from django.conf import settings
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False)
+    db_file.close()
+    settings.DATABASES['default']['NAME'] = db_file.name
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+
+    from benchmarks.seed import seed
+
+    try:
+        call_command('migrate', verbosity=0)
+        started = time.perf_counter()
+        author_ids, group_ids = seed(
+            args.posts, users=args.users, groups=args.groups
+        )
+        print(f'Заполнено {args.posts} постов за '
+              f'{time.perf_counter() - started:.1f} с')
+
+        call_command('migrate', 'posts', '0004', verbosity=0)
+        report('Без индексов лент', author_ids[0], group_ids[0], args.depth)
+        call_command('migrate', 'posts', verbosity=0)
+        report('С индексами лент', author_ids[0], group_ids[0], args.depth)
+    finally:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
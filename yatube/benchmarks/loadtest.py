@@ -0,0 +1,144 @@
+"""Нагрузка на работающий сервер клиентами с keep-alive.
+
+Каждый клиент держит одно соединение HTTP/1.1 и шлёт GET-запросы
+по кругу из списка путей, пока не выйдет время. Клиенты - корутины
+одного цикла событий, так что сотни соединений не требуют потоков.
+Замер сравнивает сервер WSGI с потоком на соединение (runserver)
+и ASGI (uvicorn) на одной и той же базе.
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from core.instrumentation import percentile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    # Поток на соединение, синхронные view
+    'wsgi': ('{python} manage.py runserver --noreload --nostatic '
+             '127.0.0.1:{port}'),
+    # Один цикл событий, асинхронные view и пул потоков для ORM
+    'asgi': ('{python} -m uvicorn yatube.asgi:application --port {port} '
+             '--log-level warning --no-access-log'),
+}
+
+
+class ProtocolError(Exception):
+    """Ответ сервера не удалось разобрать."""
+
+
+async def read_response(reader):
+    """Читает ответ, возвращает статус; тело ответа пропускается."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ProtocolError('соединение закрыто')
+    status = int(status_line.split()[1])
+    length, close = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and value == 'chunked':
+            raise ProtocolError('chunked не поддерживается')
+        elif name == 'connection' and value == 'close':
+            close = True
+    await reader.readexactly(length)
+    return status, close
+
+
+async def client(port, paths, deadline, rnd, results):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        if writer is None:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        path = rnd.choice(paths)
+        started = time.perf_counter()
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+            f'Connection: keep-alive\r\n\r\n'.encode()
+        )
+        try:
+            status, close = await read_response(reader)
+        except (ProtocolError, ConnectionError, asyncio.IncompleteReadError):
+            results['errors'] += 1
+            writer.close()
+            writer = None
+            continue
+        results['latencies'].append((time.perf_counter() - started) * 1000)
+        if status != 200:
+            results['errors'] += 1
+        if close:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, paths, connections=100, seconds=10, seed=0):
+    results = {'latencies': [], 'errors': 0}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(
+        client(port, paths, deadline, random.Random(seed + number), results)
+        for number in range(connections)
+    ))
+    latencies = results['latencies']
+    return {
+        'requests_per_second': round(len(latencies) / seconds, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'errors': results['errors'],
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('сервер завершился при запуске')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'сервер не открыл порт {port}')
+
+
+def run_server(kind, env, paths, connections=100, seconds=10):
+    """Запускает сервер kind, прогревает и замеряет его."""
+    port = free_port()
+    command = SERVERS[kind].format(python=sys.executable, port=port)
+    process = subprocess.Popen(
+        command.split(), cwd=BASE_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port, process)
+        asyncio.run(load(port, paths, connections=4, seconds=1))
+        return asyncio.run(load(port, paths, connections, seconds))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def compare(database, paths, connections=100, seconds=10, kinds=SERVERS):
+    env = dict(os.environ, YATUBE_DB_NAME=database)
+    env.pop('YATUBE_ASYNC_VIEWS', None)
+    return {
+        kind: run_server(kind, env, paths, connections, seconds)
+        for kind in kinds
+    }
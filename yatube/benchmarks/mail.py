@@ -0,0 +1,100 @@
+"""Синхронная отправка почты против очереди core.mail.
+
+Письма пишет файловый бэкенд (или любой EMAIL_QUEUE_BACKEND, например
+SMTP к локальному серверу). Замеряются:
+
+- password_reset - время ответа на форму сброса пароля: письмо
+  отправляется в потоке запроса или только ставится в очередь;
+- bulk - рассылка messages писем: по соединению на письмо, как при
+  send_mail в цикле, или send_bulk пачками и отправка задачами.
+"""
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core import jobs
+from core.instrumentation import percentile
+from core.mail import DEFAULT_QUEUE_BACKEND, send_bulk
+
+User = get_user_model()
+
+QUEUED_BACKEND = 'core.mail.QueuedEmailBackend'
+
+
+def _drain():
+    started = time.perf_counter()
+    jobs.run_pending()
+    return (time.perf_counter() - started) * 1000
+
+
+def password_reset(directory, requests=100, backend=DEFAULT_QUEUE_BACKEND):
+    """Задержки формы сброса пароля без очереди и с очередью."""
+    user = User.objects.create_user(
+        username='bench_mail', email='bench_mail@example.com',
+        password='bench-password',
+    )
+    client = Client()
+    url = reverse('users:password_reset')
+    report = {}
+    for name, email_backend in (('sync', backend), ('queued', QUEUED_BACKEND)):
+        path = os.path.join(directory, f'reset_{name}')
+        with override_settings(EMAIL_BACKEND=email_backend,
+                               EMAIL_QUEUE_BACKEND=backend,
+                               EMAIL_FILE_PATH=path):
+            latencies = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                client.post(url, {'email': user.email})
+                latencies.append((time.perf_counter() - started) * 1000)
+            # В режиме sync очередь пуста, в queued - письма уходят здесь
+            drain_ms = _drain()
+        report[name] = {
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'drain_ms': round(drain_ms, 1),
+        }
+    user.delete()
+    return report
+
+
+def _messages(count):
+    return (
+        EmailMessage('Объявление', 'Текст объявления',
+                     to=[f'user{number}@example.com'])
+        for number in range(count)
+    )
+
+
+def bulk(directory, messages=1000, batch_size=100,
+         backend=DEFAULT_QUEUE_BACKEND):
+    """Рассылка messages писем без очереди и через send_bulk."""
+    report = {}
+    path = os.path.join(directory, 'bulk_sync')
+    with override_settings(EMAIL_FILE_PATH=path):
+        started = time.perf_counter()
+        for message in _messages(messages):
+            # Как send_mail: новое соединение на каждое письмо
+            get_connection(backend).send_messages([message])
+        seconds = time.perf_counter() - started
+    report['sync'] = {
+        'seconds': round(seconds, 3),
+        'messages_per_second': round(messages / seconds),
+    }
+
+    path = os.path.join(directory, 'bulk_queued')
+    with override_settings(EMAIL_QUEUE_BACKEND=backend, EMAIL_FILE_PATH=path):
+        started = time.perf_counter()
+        send_bulk(_messages(messages), size=batch_size)
+        enqueue_seconds = time.perf_counter() - started
+        seconds = enqueue_seconds + _drain() / 1000
+    report['queued'] = {
+        'enqueue_seconds': round(enqueue_seconds, 3),
+        'seconds': round(seconds, 3),
+        'messages_per_second': round(messages / seconds),
+    }
+    return report
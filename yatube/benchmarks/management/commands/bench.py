@@ -0,0 +1,79 @@
+import json
+import subprocess
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from benchmarks import runner
+from benchmarks.seed import seed
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет отдельную тестовую базу постами и замеряет '
+        'основные страницы. Результат выводится в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='10k',
+            help='число постов в базе',
+        )
+        parser.add_argument('--requests', type=int, default=100,
+                            help='запросов к каждой странице')
+        parser.add_argument('--views', nargs='+',
+                            help='замерять только эти страницы')
+        parser.add_argument('--page-cache', action='store_true',
+                            help='не отключать кеш страниц лент')
+        parser.add_argument('--output', help='файл для JSON-отчёта')
+
+    def handle(self, *args, **options):
+        posts = SCALES[options['scale']]
+        # Замеры идут на тестовой базе, рабочая база не затрагивается
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            started = time.perf_counter()
+            seed(posts, users=max(10, posts // 100),
+                 groups=max(5, posts // 1000))
+            seed_seconds = time.perf_counter() - started
+
+            cache_settings = (
+                {} if options['page_cache'] else {'PAGE_CACHE_TIMEOUT': 0}
+            )
+            with override_settings(**cache_settings):
+                views = runner.run(options['requests'], options['views'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = json.dumps({
+            'commit': current_commit(),
+            'posts': posts,
+            'requests': options['requests'],
+            'page_cache': options['page_cache'],
+            'seed_seconds': round(seed_seconds, 2),
+            'views': views,
+        }, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        self.stdout.write(report)
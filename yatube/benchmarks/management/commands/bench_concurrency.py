@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from benchmarks import concurrency
+from benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет чтение лент во время публикации постов для прагм '
+        'SQLite разработки и production. Результат выводится в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10_000,
+                            help='число постов в базе')
+        parser.add_argument('--readers', type=int, default=4,
+                            help='потоков-читателей')
+        parser.add_argument('--seconds', type=float, default=5,
+                            help='длительность замера каждого профиля')
+        parser.add_argument('--output', help='файл для JSON-отчёта')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write('Замер рассчитан на SQLite')
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            # WAL не работает с базой в памяти: тестовая база - файл
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'bench.sqlite3'
+            )
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                posts = options['posts']
+                seed(posts, users=max(10, posts // 100),
+                     groups=max(5, posts // 1000))
+                profiles = concurrency.compare(
+                    options['readers'], options['seconds']
+                )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = json.dumps({
+            'posts': options['posts'],
+            'readers': options['readers'],
+            'seconds': options['seconds'],
+            'profiles': profiles,
+        }, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        self.stdout.write(report)
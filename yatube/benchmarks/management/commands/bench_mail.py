@@ -0,0 +1,58 @@
+import json
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from benchmarks import mail
+from core.mail import DEFAULT_QUEUE_BACKEND
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает отправку почты в потоке запроса и через очередь '
+        'фоновых задач. Результат выводится в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100,
+                            help='запросов к форме сброса пароля')
+        parser.add_argument('--messages', type=int, default=1000,
+                            help='писем в рассылке')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='писем в одной задаче отправки')
+        parser.add_argument(
+            '--backend', default=DEFAULT_QUEUE_BACKEND,
+            help='бэкенд, которым письма отправляются на самом деле',
+        )
+        parser.add_argument('--output', help='файл для JSON-отчёта')
+
+    def handle(self, *args, **options):
+        # Задачи пишутся в таблицу тестовой базы, рабочая не затрагивается
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                password_reset = mail.password_reset(
+                    directory, options['requests'], options['backend']
+                )
+                bulk = mail.bulk(
+                    directory, options['messages'], options['batch_size'],
+                    options['backend'],
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = json.dumps({
+            'backend': options['backend'],
+            'requests': options['requests'],
+            'messages': options['messages'],
+            'batch_size': options['batch_size'],
+            'password_reset': password_reset,
+            'bulk': bulk,
+        }, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        self.stdout.write(report)
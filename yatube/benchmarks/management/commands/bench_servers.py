@@ -0,0 +1,82 @@
+import json
+import os
+import random
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.urls import reverse
+
+from benchmarks import loadtest
+from benchmarks.seed import seed
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+def sample_paths(count, rnd):
+    """Ленты, профили и посты из базы замера вперемешку."""
+    paths = [reverse('posts:index'), reverse('about:author')]
+    for slug in Group.objects.values_list('slug', flat=True)[:count]:
+        paths.append(reverse('posts:group_list', args=(slug,)))
+    for username in User.objects.values_list('username', flat=True)[:count]:
+        paths.append(reverse('posts:profile', args=(username,)))
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    for post_id in rnd.sample(post_ids, min(count, len(post_ids))):
+        paths.append(reverse('posts:post_detail', args=(post_id,)))
+    return paths
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность WSGI (runserver, поток на '
+        'соединение) и ASGI (uvicorn) под клиентами с keep-alive. '
+        'Результат выводится в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10_000,
+                            help='число постов в базе')
+        parser.add_argument('--connections', type=int, default=100,
+                            help='одновременных соединений')
+        parser.add_argument('--seconds', type=float, default=10,
+                            help='длительность замера каждого сервера')
+        parser.add_argument('--servers', nargs='+',
+                            choices=loadtest.SERVERS,
+                            default=list(loadtest.SERVERS),
+                            help='какие серверы замерять')
+        parser.add_argument('--output', help='файл для JSON-отчёта')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            # Серверы - отдельные процессы: база замера должна быть файлом
+            database = os.path.join(directory, 'bench.sqlite3')
+            connection.settings_dict['TEST']['NAME'] = database
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                posts = options['posts']
+                seed(posts, users=max(10, posts // 100),
+                     groups=max(5, posts // 1000))
+                paths = sample_paths(50, random.Random(0))
+                connections.close_all()
+                servers = loadtest.compare(
+                    database, paths, options['connections'],
+                    options['seconds'], options['servers'],
+                )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = json.dumps({
+            'posts': options['posts'],
+            'connections': options['connections'],
+            'seconds': options['seconds'],
+            'paths': len(paths),
+            'servers': servers,
+        }, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        self.stdout.write(report)
@@ -0,0 +1,85 @@
+"""Прогон основных страниц через тестовый клиент с замерами."""
+import random
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.instrumentation import percentile
+from posts.models import Group, Post
+
+User = get_user_model()
+
+PERCENTILES = (50, 95, 99)
+
+
+def build_requests(rnd):
+    """Возвращает {view: функция, выполняющая один запрос к view}."""
+    usernames = list(User.objects.values_list('username', flat=True))
+    slugs = list(Group.objects.values_list('slug', flat=True))
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    author = User.objects.get(username=usernames[0])
+
+    guest = Client()
+    author_client = Client()
+    author_client.force_login(author)
+
+    return {
+        'index': lambda: guest.get(reverse('posts:index')),
+        'group_posts': lambda: guest.get(
+            reverse('posts:group_list', args=(rnd.choice(slugs),))
+        ),
+        'profile': lambda: guest.get(
+            reverse('posts:profile', args=(rnd.choice(usernames),))
+        ),
+        'post_detail': lambda: guest.get(
+            reverse('posts:post_detail', args=(rnd.choice(post_ids),))
+        ),
+        'post_create': lambda: author_client.post(
+            reverse('posts:post_create'), {'text': 'Пост из замера'}
+        ),
+    }
+
+
+def measure_view(make_request, requests):
+    """Задержки, число запросов к БД и пик памяти для одного view."""
+    timings = []
+    queries = []
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            make_request()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+
+    # Память замеряем отдельным запросом: tracemalloc искажает время
+    tracemalloc.start()
+    make_request()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        f'p{percent}_ms': round(percentile(timings, percent), 3)
+        for percent in PERCENTILES
+    }
+    result.update({
+        'mean_queries': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    })
+    return result
+
+
+def run(requests=100, views=None, random_seed=0):
+    """Прогоняет view из views (по умолчанию все) на текущей базе."""
+    rnd = random.Random(random_seed)
+    request_makers = build_requests(rnd)
+    return {
+        view: measure_view(make_request, requests)
+        for view, make_request in request_makers.items()
+        if views is None or view in views
+    }
@@ -0,0 +1,83 @@
+"""Массовое заполнение базы пользователями, группами и постами."""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from posts import timeline
+from posts.counters import rebuild_counters
+from posts.models import Group, Post
+from posts.search import get_backend as get_search_backend
+
+User = get_user_model()
+
+USERNAME = 'bench_user_{}'
+GROUP_SLUG = 'bench-group-{}'
+
+
+@contextmanager
+def explicit_pub_date():
+    """Позволяет задать pub_date вручную, несмотря на auto_now_add."""
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def seed(posts, users=100, groups=20, batch_size=5000, random_seed=0):
+    """Создаёт users авторов, groups групп и posts постов.
+
+    Посты распределяются по авторам случайно, примерно половина - без
+    группы. Даты публикации идут по секунде назад от текущего момента.
+    Сигналы при bulk_create не срабатывают, поэтому счётчики,
+    поисковый индекс и материализованные ленты пересчитываются
+    в конце.
+    """
+    rnd = random.Random(random_seed)
+    with transaction.atomic():
+        User.objects.bulk_create(
+            (User(username=USERNAME.format(i), first_name='Bench',
+                  last_name=str(i), password='!') for i in range(users)),
+            batch_size=batch_size,
+        )
+        Group.objects.bulk_create(
+            (Group(title=f'Группа {i}', slug=GROUP_SLUG.format(i),
+                   description='Группа для замеров') for i in range(groups)),
+            batch_size=batch_size,
+        )
+    author_ids = list(
+        User.objects.filter(username__startswith='bench_user_')
+        .values_list('id', flat=True)
+    )
+    group_ids = list(
+        Group.objects.filter(slug__startswith='bench-group-')
+        .values_list('id', flat=True)
+    )
+
+    now = timezone.now()
+    with explicit_pub_date():
+        for start in range(0, posts, batch_size):
+            stop = min(start + batch_size, posts)
+            with transaction.atomic():
+                Post.objects.bulk_create(
+                    Post(
+                        text=f'Пост номер {i} ' * rnd.randint(1, 20),
+                        pub_date=now - timedelta(seconds=posts - i),
+                        author_id=rnd.choice(author_ids),
+                        group_id=(
+                            rnd.choice(group_ids) if rnd.random() < 0.5
+                            else None
+                        ),
+                    )
+                    for i in range(start, stop)
+                )
+    rebuild_counters()
+    get_search_backend().rebuild()
+    timeline.home.invalidate()
+    timeline.invalidate_scopes(author_ids, group_ids)
+    return author_ids, group_ids
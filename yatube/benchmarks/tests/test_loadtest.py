@@ -0,0 +1,38 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from .. import loadtest
+
+RESPONSE = (b'HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n'
+            b'Content-Length: 2\r\n\r\nok')
+
+
+async def handle(reader, writer):
+    # Отвечает на все запросы одного соединения, как keep-alive сервер
+    try:
+        while True:
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        # Клиент закрыл соединение, когда вышло время
+        pass
+    finally:
+        writer.close()
+
+
+class LoadTest(SimpleTestCase):
+    async def run_load(self, connections):
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await loadtest.load(
+                port, ['/', '/about/'], connections=connections, seconds=0.2
+            )
+
+    def test_keep_alive_clients(self):
+        report = asyncio.run(self.run_load(connections=5))
+        self.assertGreater(report['requests_per_second'], 0)
+        self.assertEqual(report['errors'], 0)
+        self.assertLessEqual(report['p50_ms'], report['p99_ms'])
@@ -0,0 +1,40 @@
+from django.test import TestCase
+
+from posts.models import AuthorStats, Group, Post
+
+from .. import runner
+from ..seed import seed
+
+
+class BenchmarkRunnerTest(TestCase):
+    def test_seed(self):
+        author_ids, group_ids = seed(50, users=5, groups=2, batch_size=20)
+        self.assertEqual(Post.objects.count(), 50)
+        self.assertEqual(len(author_ids), 5)
+        self.assertEqual(len(group_ids), 2)
+        # Счётчики пересчитаны после bulk_create
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('post_count', flat=True)),
+            50
+        )
+        self.assertEqual(
+            sum(Group.objects.values_list('post_count', flat=True)),
+            Post.objects.exclude(group=None).count()
+        )
+
+    def test_run_reports_every_view(self):
+        seed(30, users=3, groups=2)
+        report = runner.run(requests=3)
+        self.assertEqual(set(report), {
+            'index', 'group_posts', 'profile', 'post_detail', 'post_create',
+        })
+        for view, result in report.items():
+            with self.subTest(view=view):
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+                self.assertGreater(result['max_queries'], 0)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(runner.percentile(values, 50), 50)
+        self.assertEqual(runner.percentile(values, 99), 99)
+        self.assertEqual(runner.percentile([7], 95), 7)
@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        # Регистрируем фоновую задачу отправки писем
+        from . import mail  # noqa: F401
+        from .db import apply_sqlite_pragmas
+
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid='core.apply_sqlite_pragmas'
+        )
@@ -0,0 +1,56 @@
+"""Асинхронные обёртки над синхронными view для ASGI.
+
+Цикл событий не ждёт базу и шаблоны: async_view выполняет весь
+синхронный view (ORM, кеш, рендер) в отдельном пуле из
+ASYNC_VIEW_THREADS потоков. Соединения с базой у потоков пула свои,
+поэтому они закрываются по тем же правилам, что и в конце обычного
+запроса (close_old_connections).
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial, wraps
+
+from django.conf import settings
+from django.db import close_old_connections
+
+DEFAULT_THREADS = 32
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ASYNC_VIEW_THREADS',
+                                DEFAULT_THREADS),
+            thread_name_prefix='async-view',
+        )
+    return _executor
+
+
+def _run(view, request, *args, **kwargs):
+    # Запросы view пишет замер InstrumentationMiddleware этого запроса
+    recorder = getattr(request, 'query_recorder', None)
+    close_old_connections()
+    try:
+        with recorder.record() if recorder else nullcontext():
+            return view(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Асинхронный вариант view: сам view выполняется в пуле потоков."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # Как sync_to_async, но в своём пуле: параметр executor
+        # появился только в asgiref 3.8, которому нужен Python 3.8+
+        context = contextvars.copy_context()
+        return await asyncio.get_event_loop().run_in_executor(
+            executor(),
+            partial(context.run, _run, view, request, *args, **kwargs),
+        )
+    return wrapper
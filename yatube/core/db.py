@@ -0,0 +1,90 @@
+"""Настройка соединений с базой и чтение с реплик.
+
+Прагмы SQLite берутся из настройки SQLITE_PRAGMAS и выполняются для
+каждого нового соединения: journal_mode=WAL хранится в самом файле
+базы, остальные (synchronous, cache_size, ...) действуют только
+на соединение.
+"""
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Обработчик сигнала connection_created."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None) or {}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+# Чтение с реплик включается только внутри view, помеченных
+# read_from_replica; всё остальное (формы, авторизация) читает
+# и пишет в основную базу.
+_replica_reads = ContextVar('replica_reads', default=False)
+
+# Cookie, которая после записи закрепляет пользователя за основной
+# базой, пока реплики не догонят её (REPLICA_PIN_SECONDS)
+PIN_COOKIE = 'pin_primary'
+DEFAULT_PIN_SECONDS = 10
+# Сессии всегда читаем из основной базы: только что созданной
+# сессии на реплике может ещё не быть
+PRIMARY_ONLY_APPS = ('sessions',)
+
+
+def use_primary(request):
+    """Весь запрос читает из основной базы, даже в read_from_replica.
+
+    Например, страница, которая уйдёт в кеш: построенная по отставшей
+    реплике, она бы надолго закрепила старые данные.
+    """
+    request.use_primary = True
+
+
+def read_from_replica(view):
+    """Разрешает view читать с реплик, если пользователь не закреплён."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if PIN_COOKIE in request.COOKIES or getattr(
+            request, 'use_primary', False
+        ):
+            return view(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Отправляет чтение помеченных view на случайную реплику.
+
+    Реплики перечислены в настройке DATABASE_REPLICAS; если их нет,
+    роутер ничего не меняет. Запись и миграции - только в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', None)
+        if (
+            replicas
+            and _replica_reads.get()
+            and model._meta.app_label not in PRIMARY_ONLY_APPS
+        ):
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной базе
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,166 @@
+"""Учёт времени и SQL-запросов по view без DEBUG и debug-toolbar.
+
+Для каждого view хранится скользящее окно последних замеров и
+гистограмма времени ответа. Окно периодически сбрасывается в JSON-файл
+процесса, откуда его читает команда request_stats; файл пишет фоновый
+поток, а не поток запроса.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограммы времени ответа, мс
+HISTOGRAM_BOUNDS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+DEFAULT_WINDOW = 1000
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class QueryRecorder:
+    """Обёртка execute_wrapper: считает запросы, их время и повторы."""
+
+    def __init__(self):
+        self.db_ms = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.statements[sql, repr(params)] += 1
+
+    @property
+    def queries(self):
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values())
+
+    def record(self):
+        """Контекст, в котором пишутся запросы ко всем базам."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+def histogram_bucket(wall_ms):
+    for bound in HISTOGRAM_BOUNDS:
+        if wall_ms <= bound:
+            return f'<={bound}ms'
+    return f'>{HISTOGRAM_BOUNDS[-1]}ms'
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[rank]
+
+
+def summarize(samples):
+    """Сводка по списку замеров одного view."""
+    walls = [sample['wall_ms'] for sample in samples]
+    count = len(samples)
+    return {
+        'requests': count,
+        'p50_ms': round(percentile(walls, 50), 2),
+        'p95_ms': round(percentile(walls, 95), 2),
+        'p99_ms': round(percentile(walls, 99), 2),
+        'mean_db_ms': round(
+            sum(sample['db_ms'] for sample in samples) / count, 2
+        ),
+        'mean_queries': round(
+            sum(sample['queries'] for sample in samples) / count, 2
+        ),
+        'duplicates': sum(sample['duplicates'] for sample in samples),
+        'histogram': dict(Counter(histogram_bucket(wall) for wall in walls)),
+    }
+
+
+class RequestStats:
+    """Скользящее окно замеров по каждому view текущего процесса."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+        self._since_flush = 0
+        self._flushing = False
+
+    def add(self, view_name, **sample):
+        with self._lock:
+            self._samples[view_name].append(sample)
+            self._since_flush += 1
+            flush = not self._flushing and self._since_flush >= getattr(
+                settings, 'REQUEST_STATS_FLUSH_EVERY', 100
+            )
+            if flush:
+                self._flushing = True
+        if flush:
+            # Файл пишется в фоне: ответ на запрос его не ждёт
+            threading.Thread(
+                target=self._flush_in_background,
+                name='request-stats-flush', daemon=True,
+            ).start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except OSError:
+            logger.exception('Замеры запросов не сохранены')
+        finally:
+            self._flushing = False
+
+    def samples(self):
+        with self._lock:
+            return {view: list(samples)
+                    for view, samples in self._samples.items()}
+
+    def summary(self):
+        return {view: summarize(samples)
+                for view, samples in sorted(self.samples().items())}
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._since_flush = 0
+
+    def flush(self):
+        """Сохраняет окно процесса в REQUEST_STATS_DIR/<pid>.json."""
+        directory = settings.REQUEST_STATS_DIR
+        os.makedirs(directory, exist_ok=True)
+        samples = self.samples()
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        with open(path, 'w') as dump:
+            json.dump(samples, dump)
+        with self._lock:
+            self._since_flush = 0
+
+
+def load_dumps(directory):
+    """Объединяет окна, сохранённые всеми процессами."""
+    merged = defaultdict(list)
+    if not os.path.isdir(directory):
+        return merged
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, name)) as dump:
+            for view, samples in json.load(dump).items():
+                merged[view].extend(samples)
+    return merged
+
+
+stats = RequestStats(getattr(settings, 'REQUEST_STATS_WINDOW', DEFAULT_WINDOW))
@@ -0,0 +1,226 @@
+"""Фоновые задачи, которые выполняются после ответа на запрос.
+
+Задача - зарегистрированная функция с JSON-аргументами::
+
+    @jobs.register('posts.index_post')
+    def index_post(post_id):
+        ...
+
+    jobs.enqueue('posts.index_post', post_id=post.pk)
+
+enqueue записывает задачу в таблицу core_job в той же транзакции,
+что и данные, а после коммита (transaction.on_commit) кладёт её id
+в ограниченную очередь пула потоков. Если очередь полна или процесс
+упал, задачу найдёт опрос таблицы раз в JOB_POLL_INTERVAL секунд,
+чем бы ни была занята очередь: строка удаляется только после
+успешного выполнения. Ошибка откладывает задачу на JOB_RETRY_DELAY
+секунд, удваивая паузу с каждой попыткой; после JOB_MAX_ATTEMPTS
+попыток задача помечается failed и ждёт разбора (manage.py jobs).
+
+С JOBS_EAGER = True задачи выполняются сразу в вызывающем потоке -
+это режим для тестов.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'JOB_WORKERS': 2,
+    'JOB_QUEUE_SIZE': 1000,
+    'JOB_MAX_ATTEMPTS': 5,
+    'JOB_RETRY_DELAY': 5,
+    'JOB_POLL_INTERVAL': 5,
+    'JOB_TIMEOUT': 600,
+}
+
+registry = {}
+
+
+def setting(name):
+    return getattr(settings, name, DEFAULTS.get(name))
+
+
+def register(name):
+    """Декоратор: регистрирует функцию как задачу с именем name."""
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, **arguments):
+    """Ставит задачу в очередь после коммита текущей транзакции."""
+    if name not in registry:
+        raise KeyError(f'Неизвестная задача: {name}')
+    if setting('JOBS_EAGER'):
+        registry[name](**arguments)
+        return None
+    job = Job(name=name, run_after=timezone.now())
+    job.arguments = arguments
+    job.save()
+    transaction.on_commit(lambda: pool.submit(job.pk))
+    return job
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: 1x, 2x, 4x... JOB_RETRY_DELAY."""
+    return timedelta(seconds=setting('JOB_RETRY_DELAY') * 2 ** (attempts - 1))
+
+
+def run_job(job_id):
+    """Выполняет задачу, если её ещё никто не взял; True - взяли мы."""
+    now = timezone.now()
+    claimed = Job.objects.filter(
+        pk=job_id, status=Job.PENDING, run_after__lte=now,
+    ).update(status=Job.RUNNING, attempts=F('attempts') + 1, locked_at=now)
+    if not claimed:
+        return False
+    job = Job.objects.get(pk=job_id)
+    try:
+        handler = registry[job.name]
+        handler(**job.arguments)
+    except Exception as error:
+        logger.exception('Задача %s не выполнена', job)
+        job.last_error = repr(error)
+        job.locked_at = None
+        if job.attempts >= setting('JOB_MAX_ATTEMPTS'):
+            job.status = Job.FAILED
+        else:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + retry_delay(job.attempts)
+        job.save(update_fields=(
+            'status', 'run_after', 'locked_at', 'last_error',
+        ))
+    else:
+        job.delete()
+    return True
+
+
+def due_jobs(limit=100):
+    """id задач, которые пора выполнить, старые первыми."""
+    return list(
+        Job.objects.filter(status=Job.PENDING, run_after__lte=timezone.now())
+        .order_by('run_after', 'id').values_list('id', flat=True)[:limit]
+    )
+
+
+def run_pending():
+    """Выполняет все готовые задачи в текущем потоке; возвращает число."""
+    done = 0
+    while True:
+        ids = due_jobs()
+        ran = [job_id for job_id in ids if run_job(job_id)]
+        done += len(ran)
+        if not ran:
+            return done
+
+
+def recover():
+    """Возвращает в очередь задачи, зависшие в running.
+
+    Такие остаются, если процесс упал посреди задачи: через
+    JOB_TIMEOUT секунд их снова можно брать.
+    """
+    stale = timezone.now() - timedelta(seconds=setting('JOB_TIMEOUT'))
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=stale,
+    ).update(status=Job.PENDING, locked_at=None)
+
+
+class WorkerPool:
+    """Потоки, которые выполняют задачи из очереди и из таблицы."""
+
+    def __init__(self):
+        self.queue = None
+        self.threads = []
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+
+    @property
+    def running(self):
+        return bool(self.threads)
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.stopping.clear()
+            self.queue = queue.Queue(maxsize=setting('JOB_QUEUE_SIZE'))
+            for number in range(setting('JOB_WORKERS')):
+                thread = threading.Thread(
+                    target=self.work, name=f'job-worker-{number}',
+                    daemon=True,
+                )
+                thread.start()
+                self.threads.append(thread)
+
+    def stop(self, timeout=None):
+        self.stopping.set()
+        for _ in self.threads:
+            # Будим потоки, ждущие очередь
+            try:
+                self.queue.put_nowait(None)
+            except queue.Full:
+                pass
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def submit(self, job_id):
+        if not self.running:
+            # Пул не запущен (shell, команды): задачу подберёт
+            # опрос таблицы в веб-процессе или manage.py jobs --drain
+            return
+        try:
+            self.queue.put_nowait(job_id)
+        except queue.Full:
+            pass
+
+    def work(self):
+        next_poll = time.monotonic()
+        while not self.stopping.is_set():
+            # Таблицу опрашиваем по расписанию, а не только когда
+            # очередь пуста: иначе при постоянном потоке новых задач
+            # повторы и задачи, не влезшие в очередь, не выполнятся
+            if time.monotonic() >= next_poll:
+                self.safely(recover)
+                self.safely(self.poll)
+                next_poll = time.monotonic() + setting('JOB_POLL_INTERVAL')
+            try:
+                job_id = self.queue.get(
+                    timeout=max(0, next_poll - time.monotonic())
+                )
+            except queue.Empty:
+                continue
+            if job_id is not None:
+                self.safely(run_job, job_id)
+            self.queue.task_done()
+
+    def poll(self):
+        for job_id in due_jobs():
+            if self.stopping.is_set():
+                return
+            run_job(job_id)
+
+    def safely(self, func, *args):
+        try:
+            func(*args)
+        except Exception:
+            # Например, база недоступна: задача останется в таблице
+            logger.exception('Ошибка рабочего потока задач')
+        finally:
+            close_old_connections()
+
+
+pool = WorkerPool()
@@ -0,0 +1,90 @@
+"""Отправка почты пачками в фоновых задачах.
+
+QueuedEmailBackend (EMAIL_BACKEND) не отправляет письма сам: он
+сохраняет их в задачу core.jobs и сразу возвращает управление.
+Рабочий поток отправляет пачку писем через настоящий бэкенд
+EMAIL_QUEUE_BACKEND, открыв одно соединение на всю пачку: файловый
+бэкенд пишет пачку в один файл, SMTP - в одну сессию.
+
+send_bulk раскладывает по задачам длинную рассылку (например,
+объявление всем пользователям) пачками по EMAIL_BATCH_SIZE писем.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+
+from . import jobs
+
+DEFAULT_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+DEFAULT_BATCH_SIZE = 100
+FIELDS = ('subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to',
+          'extra_headers')
+
+
+def serialize(message):
+    """Письмо в виде словаря для JSON-аргументов задачи."""
+    if message.attachments:
+        raise ValueError('Вложения в очереди писем не поддерживаются')
+    data = {field: getattr(message, field) for field in FIELDS}
+    data['alternatives'] = getattr(message, 'alternatives', [])
+    return data
+
+
+def deserialize(data):
+    data = dict(data)
+    alternatives = data.pop('alternatives', [])
+    data['headers'] = data.pop('extra_headers')
+    message = EmailMultiAlternatives(**data)
+    for content, mimetype in alternatives:
+        message.attach_alternative(content, mimetype)
+    return message
+
+
+def batch_size():
+    return getattr(settings, 'EMAIL_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+
+@jobs.register('core.send_emails')
+def send_emails(messages):
+    connection = get_connection(
+        getattr(settings, 'EMAIL_QUEUE_BACKEND', DEFAULT_QUEUE_BACKEND)
+    )
+    # Ошибка прерывает задачу, и пачка уйдёт повторно целиком
+    connection.send_messages([deserialize(data) for data in messages])
+
+
+def send_bulk(messages, size=None):
+    """Ставит письма в очередь пачками; возвращает число писем.
+
+    messages может быть генератором: в памяти держится одна пачка.
+    """
+    messages = iter(messages)
+    size = size or batch_size()
+    sent = 0
+    # Одна транзакция на всю рассылку: задачи попадут в очередь
+    # после коммита разом, а не по одной
+    with transaction.atomic():
+        while True:
+            batch = [serialize(message)
+                     for message in islice(messages, size)]
+            if not batch:
+                return sent
+            jobs.enqueue('core.send_emails', messages=batch)
+            sent += len(batch)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который откладывает отправку в фоновую задачу."""
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        try:
+            return send_bulk(email_messages)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
@@ -0,0 +1,39 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.mail import send_bulk
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Рассылает объявление всем активным пользователям с почтой'
+
+    def add_arguments(self, parser):
+        parser.add_argument('subject', help='тема письма')
+        parser.add_argument('body', nargs='?', default='-',
+                            help='текст письма; "-" - читать из stdin')
+        parser.add_argument('--batch-size', type=int,
+                            help='писем в одной задаче отправки')
+
+    def handle(self, *args, **options):
+        body = options['body']
+        if body == '-':
+            body = sys.stdin.read()
+        if not body.strip():
+            raise CommandError('Пустой текст письма')
+        emails = (
+            User.objects.filter(is_active=True).exclude(email='')
+            .values_list('email', flat=True).iterator()
+        )
+        sent = send_bulk(
+            (EmailMessage(options['subject'], body, to=[email])
+             for email in emails),
+            size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Писем поставлено в очередь: {sent}'
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Состояние очереди фоновых задач; выполнение и повтор задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drain', action='store_true',
+                            help='выполнить все готовые задачи здесь же')
+        parser.add_argument('--now', action='store_true',
+                            help='с --drain: не ждать паузы перед повтором')
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='вернуть в очередь задачи со статусом failed')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            retried = Job.objects.filter(status=Job.FAILED).update(
+                status=Job.PENDING, attempts=0, run_after=timezone.now(),
+            )
+            self.stdout.write(f'Возвращено в очередь: {retried}')
+        if options['drain']:
+            jobs.recover()
+            if options['now']:
+                Job.objects.filter(status=Job.PENDING).update(
+                    run_after=timezone.now()
+                )
+            done = jobs.run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {done}'))
+
+        rows = (Job.objects.values('name', 'status')
+                .annotate(count=Count('id')).order_by('name', 'status'))
+        if not rows:
+            self.stdout.write('Очередь пуста')
+            return
+        for row in rows:
+            self.stdout.write(
+                f'{row["name"]:<32} {row["status"]:<10} {row["count"]:>8}'
+            )
+        for job in Job.objects.filter(status=Job.FAILED).order_by('id'):
+            self.stderr.write(f'{job}: {job.last_error}')
@@ -0,0 +1,43 @@
+import json
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.instrumentation import load_dumps, summarize
+
+ROW = '{view:<32} {requests:>8} {p50_ms:>8} {p95_ms:>8} {p99_ms:>8} ' \
+      '{mean_db_ms:>8} {mean_queries:>8} {duplicates:>6}'
+
+
+class Command(BaseCommand):
+    help = 'Сводка времени ответа и SQL-запросов по view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true',
+                            help='вывести сводку в JSON')
+        parser.add_argument('--reset', action='store_true',
+                            help='удалить накопленные замеры')
+
+    def handle(self, *args, **options):
+        directory = settings.REQUEST_STATS_DIR
+        if options['reset']:
+            shutil.rmtree(directory, ignore_errors=True)
+            self.stdout.write(self.style.SUCCESS('Замеры удалены'))
+            return
+
+        summary = {view: summarize(samples)
+                   for view, samples in sorted(load_dumps(directory).items())}
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        if not summary:
+            self.stdout.write('Замеров пока нет')
+            return
+        self.stdout.write(ROW.format(
+            view='view', requests='requests', p50_ms='p50', p95_ms='p95',
+            p99_ms='p99', mean_db_ms='db', mean_queries='queries',
+            duplicates='dups',
+        ))
+        for view, row in summary.items():
+            self.stdout.write(ROW.format(view=view, **row))
@@ -0,0 +1,36 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик '
+        '(локальная замена репликации)'
+    )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Копирование реплик работает только с SQLite')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены: YATUBE_DB_REPLICAS')
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                connections[alias].close()
+                target = sqlite3.connect(
+                    connections[alias].settings_dict['NAME']
+                )
+                try:
+                    # backup копирует согласованный снимок, даже если
+                    # в основную базу в это время пишут
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: скопирована')
+        finally:
+            source.close()
+        self.stdout.write(self.style.SUCCESS('Реплики обновлены'))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны проекта: проверяет, что они компилируются, '
+        'и показывает время разбора'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        loaded, errors = warm_templates()
+        seconds = time.perf_counter() - started
+        for name, error in errors.items():
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'Не разобрано шаблонов: {len(errors)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Разобрано шаблонов: {len(loaded)} за {seconds * 1000:.1f} мс'
+        ))
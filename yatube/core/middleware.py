@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from .db import DEFAULT_PIN_SECONDS, PIN_COOKIE
+from .instrumentation import UNRESOLVED_VIEW, QueryRecorder, stats
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def show_timing(request):
+    """Отдавать ли заголовок Server-Timing на этот запрос."""
+    if settings.DEBUG:
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+class InstrumentationMiddleware:
+    """Замеряет время ответа и SQL-запросы каждого запроса.
+
+    Результат попадает в статистику core.instrumentation.stats по имени
+    view (posts:index, ...), а заголовок Server-Timing с числом и временем
+    запросов получают только сотрудники (с DEBUG - все): посторонним он
+    рассказал бы лишнее об устройстве сайта.
+    Middleware стоит первым в MIDDLEWARE, чтобы учитывать всю цепочку.
+    Под ASGI запросы асинхронного view пишет core.async_views
+    в request.query_recorder.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django узнаёт, что middleware нужно ждать (await)
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = request.query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recorder.record():
+            response = self.get_response(request)
+        return self.finish(
+            request, response, recorder, started, show_timing(request)
+        )
+
+    async def __acall__(self, request):
+        recorder = request.query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        # request.user может потребовать запроса к сессии - не в цикле
+        show = await sync_to_async(show_timing)(request)
+        return self.finish(request, response, recorder, started, show)
+
+    def finish(self, request, response, recorder, started, show):
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else UNRESOLVED_VIEW
+        stats.add(
+            view_name,
+            wall_ms=wall_ms,
+            db_ms=recorder.db_ms,
+            queries=recorder.queries,
+            duplicates=recorder.duplicates,
+        )
+        if not show:
+            return response
+        response['Server-Timing'] = (
+            f'total;dur={wall_ms:.2f}, '
+            f'db;dur={recorder.db_ms:.2f};'
+            f'desc="{recorder.queries} queries, '
+            f'{recorder.duplicates} duplicates"'
+        )
+        return response
+
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """После успешной записи читаем из основной базы REPLICA_PIN_SECONDS.
+
+    Так автор сразу видит свой новый пост, даже если реплики
+    ещё не получили изменения.
+    """
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(
+                    settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS
+                ),
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,58 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class Job(models.Model):
+    """Фоновая задача: строка живёт, пока задача не выполнена.
+
+    Таблица переживает перезапуск процесса: невыполненные задачи
+    подбирает любой рабочий поток (см. core.jobs).
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ждёт'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField(verbose_name='Тип задачи', max_length=100)
+    payload = models.TextField(verbose_name='Аргументы (JSON)', default='{}')
+    status = models.CharField(
+        verbose_name='Состояние', max_length=10,
+        choices=STATUS_CHOICES, default=PENDING,
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Попыток', default=0
+    )
+    # Раньше этого времени задачу не берём: так откладываются повторы
+    run_after = models.DateTimeField(verbose_name='Не раньше')
+    locked_at = models.DateTimeField(
+        verbose_name='Взята в работу', null=True, blank=True
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+    created = models.DateTimeField(verbose_name='Создана', auto_now_add=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'), name='job_due_idx',
+            ),
+        )
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+    @property
+    def arguments(self):
+        return json.loads(self.payload)
+
+    @arguments.setter
+    def arguments(self, value):
+        self.payload = json.dumps(value, cls=DjangoJSONEncoder)
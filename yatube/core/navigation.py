@@ -0,0 +1,26 @@
+"""Адреса ссылок шапки сайта, вычисленные один раз на процесс."""
+from functools import lru_cache
+
+from django.templatetags.static import static
+from django.urls import reverse
+
+NAV_URL_NAMES = {
+    'index': 'posts:index',
+    'search': 'posts:search',
+    'autocomplete': 'posts:autocomplete',
+    'post_create': 'posts:post_create',
+    'about_author': 'about:author',
+    'about_tech': 'about:tech',
+    'login': 'users:login',
+    'signup': 'users:signup',
+    'logout': 'users:logout',
+    'password_change': 'users:password_change',
+}
+
+
+@lru_cache(maxsize=None)
+def nav_urls():
+    """{имя ссылки: адрес} для шаблона includes/header.html."""
+    urls = {name: reverse(view) for name, view in NAV_URL_NAMES.items()}
+    urls['logo'] = static('img/logo.png')
+    return urls
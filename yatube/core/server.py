@@ -0,0 +1,54 @@
+"""Подготовка процесса веб-сервера, общая для WSGI и ASGI."""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers import asgi
+
+from .jobs import pool
+from .template_warmup import warm_templates
+
+
+def prepare():
+    # Фоновые задачи выполняются потоками этого же процесса
+    pool.start()
+    if not settings.DEBUG:
+        # Кешируемый загрузчик хранит шаблоны в памяти процесса:
+        # разбираем их до первого запроса
+        warm_templates()
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """ASGIHandler, который читает потоковые ответы вне цикла событий.
+
+    Django 3.2 перебирает StreamingHttpResponse прямо в цикле событий,
+    и генератор, который читает базу (выгрузка постов), падает
+    с SynchronousOnlyOperation. Здесь каждая часть ответа берётся через
+    sync_to_async в одном и том же потоке - там же, где ответ потом
+    закрывается и где живёт соединение с базой генератора.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        parts = iter(response)
+        # Родительский метод отправит заголовки и пустое тело,
+        # а части ответа отправляются перед последним сообщением
+        response.streaming_content = ()
+        next_part = sync_to_async(next, thread_sensitive=True)
+
+        async def send_parts(message):
+            if message['type'] == 'http.response.body' and (
+                'body' not in message
+            ):
+                while True:
+                    part = await next_part(parts, None)
+                    if part is None:
+                        break
+                    for chunk, _ in self.chunk_bytes(part):
+                        await send({
+                            'type': 'http.response.body',
+                            'body': chunk,
+                            'more_body': True,
+                        })
+            await send(message)
+
+        await super().send_response(response, send_parts)
@@ -0,0 +1,40 @@
+"""Предварительная компиляция шаблонов проекта.
+
+С кешируемым загрузчиком шаблон разбирается один раз на процесс,
+при первом запросе, который его использует. warm_templates разбирает
+все шаблоны из DIRS заранее, чтобы первый запрос после деплоя
+не платил за это.
+"""
+import os
+
+from django.template import TemplateSyntaxError, engines
+
+
+def template_names(engine):
+    """Имена всех .html-шаблонов из DIRS движка."""
+    for directory in engine.dirs:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.endswith('.html'):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, directory).replace(
+                        os.sep, '/'
+                    )
+
+
+def warm_templates(alias='django'):
+    """Загружает шаблоны в кеш загрузчика.
+
+    Возвращает список загруженных имён и словарь {имя: ошибка}
+    для шаблонов, которые не удалось разобрать.
+    """
+    engine = engines[alias].engine
+    loaded, errors = [], {}
+    for name in template_names(engine):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors[name] = str(error)
+        else:
+            loaded.append(name)
+    return loaded, errors
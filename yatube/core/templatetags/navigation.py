@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from ..navigation import nav_urls
+
+register = template.Library()
+
+# Шапка зависит только от этих трёх значений, поэтому готовый HTML
+# хранится в памяти процесса; ограничение - на случай многих
+# пользователей
+HEADER_CACHE_SIZE = 4096
+
+
+def _render_header(is_authenticated, view_name, username):
+    return render_to_string('includes/header.html', {
+        'is_authenticated': is_authenticated,
+        'view_name': view_name,
+        'username': username,
+        'urls': nav_urls(),
+    })
+
+
+_cached_header = lru_cache(maxsize=HEADER_CACHE_SIZE)(_render_header)
+
+
+@register.simple_tag(takes_context=True)
+def header(context):
+    """Шапка сайта для текущего пользователя и страницы.
+
+    В режиме DEBUG не кешируется, чтобы правки шаблона были видны сразу.
+    """
+    request = context.get('request')
+    user = getattr(request, 'user', None)
+    match = getattr(request, 'resolver_match', None)
+    is_authenticated = bool(user and user.is_authenticated)
+    key = (
+        is_authenticated,
+        match.view_name if match else None,
+        user.username if is_authenticated else '',
+    )
+    if settings.DEBUG:
+        return _render_header(*key)
+    return _cached_header(*key)
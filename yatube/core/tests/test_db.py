@@ -0,0 +1,25 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from ..db import apply_sqlite_pragmas
+
+
+class SQLitePragmasTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def tearDown(self):
+        with override_settings(SQLITE_PRAGMAS={'cache_size': -2000}):
+            apply_sqlite_pragmas(sender=None, connection=connection)
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4096})
+    def test_pragmas_applied(self):
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        self.assertEqual(self.pragma('cache_size'), -4096)
+
+    def test_no_pragmas_by_default(self):
+        before = self.pragma('cache_size')
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        self.assertEqual(self.pragma('cache_size'), before)
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..db import PIN_COOKIE, ReplicaRouter, read_from_replica
+
+User = get_user_model()
+router = ReplicaRouter()
+
+
+def post_db(request):
+    return HttpResponse(router.db_for_read(Post))
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_reads_outside_marked_views_use_primary(self):
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_marked_view_reads_from_replica(self):
+        response = read_from_replica(post_db)(self.factory.get('/'))
+        self.assertIn(response.content.decode(), ('replica_1', 'replica_2'))
+
+    def test_sessions_read_from_primary(self):
+        from django.contrib.sessions.models import Session
+
+        def session_db(request):
+            return HttpResponse(router.db_for_read(Session))
+
+        response = read_from_replica(session_db)(self.factory.get('/'))
+        self.assertEqual(response.content, b'default')
+
+    def test_pinned_user_reads_from_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        response = read_from_replica(post_db)(request)
+        self.assertEqual(response.content, b'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        response = read_from_replica(post_db)(self.factory.get('/'))
+        self.assertEqual(response.content, b'default')
+
+
+class PrimaryPinMiddlewareTest(TestCase):
+    @override_settings(REPLICA_PIN_SECONDS=30)
+    def test_write_pins_user_to_primary(self):
+        self.client.force_login(User.objects.create_user(username='auth'))
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 30)
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from posts.models import Post
+from posts.timeline import home as home_timeline
+
+from ..instrumentation import QueryRecorder, stats
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class InstrumentationMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    def setUp(self):
+        stats.reset()
+        home_timeline.load()
+
+    def test_server_timing_header(self):
+        self.assertNotIn('Server-Timing', self.client.get('/'))
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get('/')
+        self.assertIn('total;dur=', response['Server-Timing'])
+        self.assertIn('queries, 0 duplicates', response['Server-Timing'])
+        with self.settings(DEBUG=True):
+            self.client.logout()
+            self.assertIn('Server-Timing', self.client.get('/'))
+
+    def test_stats_by_view_name(self):
+        self.client.get('/')
+        self.client.get('/')
+        self.client.get(f'/profile/{self.author.username}/')
+        self.client.get('/unexisting_page/')
+        summary = stats.summary()
+        self.assertEqual(summary['posts:index']['requests'], 2)
+        self.assertEqual(summary['posts:index']['mean_queries'], 1)
+        self.assertEqual(summary['posts:profile']['requests'], 1)
+        self.assertIn('<unresolved>', summary)
+
+    def test_duplicate_queries(self):
+        recorder = QueryRecorder()
+        with recorder.record():
+            list(Post.objects.all())
+            list(Post.objects.all())
+            list(User.objects.all())
+        self.assertEqual(recorder.queries, 3)
+        self.assertEqual(recorder.duplicates, 1)
+        self.assertGreaterEqual(recorder.db_ms, 0)
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_flush_in_background(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(REQUEST_STATS_DIR=directory,
+                               REQUEST_STATS_FLUSH_EVERY=2):
+                self.client.get('/')
+                self.client.get('/')
+                path = os.path.join(directory, f'{os.getpid()}.json')
+                deadline = time.monotonic() + 5
+                while not os.path.exists(path):
+                    self.assertLess(time.monotonic(), deadline)
+                    time.sleep(0.01)
+
+    def test_request_stats_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(REQUEST_STATS_DIR=directory):
+                self.client.get('/')
+                stats.flush()
+                out = StringIO()
+                call_command('request_stats', stdout=out)
+        self.assertIn('posts:index', out.getvalue())
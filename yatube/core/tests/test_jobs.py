@@ -0,0 +1,133 @@
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .. import jobs
+from ..models import Job
+
+calls = []
+
+
+@jobs.register('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@jobs.register('tests.fail')
+def fail():
+    raise RuntimeError('сломалось')
+
+
+@override_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_DELAY=10)
+class JobsTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        job = jobs.enqueue('tests.record', value=1)
+        self.assertEqual(job.arguments, {'value': 1})
+        self.assertEqual(calls, [])
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_unknown_job(self):
+        with self.assertRaises(KeyError):
+            jobs.enqueue('tests.unknown')
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager(self):
+        self.assertIsNone(jobs.enqueue('tests.record', value=2))
+        self.assertEqual(calls, [2])
+        self.assertFalse(Job.objects.exists())
+
+    def test_retry_with_backoff(self):
+        job = jobs.enqueue('tests.fail')
+        with mock.patch.object(jobs.logger, 'exception'):
+            self.assertTrue(jobs.run_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('сломалось', job.last_error)
+        self.assertGreater(
+            job.run_after, timezone.now() + timedelta(seconds=9)
+        )
+        # Пауза ещё не прошла - задачу не берём
+        self.assertFalse(jobs.run_job(job.pk))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with mock.patch.object(jobs.logger, 'exception'):
+            jobs.run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_recover_stale_jobs(self):
+        job = jobs.enqueue('tests.record', value=3)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(jobs.recover(), 1)
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(calls, [3])
+
+    def test_command(self):
+        jobs.enqueue('tests.record', value=4)
+        failed = jobs.enqueue('tests.fail')
+        Job.objects.filter(pk=failed.pk).update(status=Job.FAILED)
+        out, err = StringIO(), StringIO()
+        call_command('jobs', stdout=out, stderr=err)
+        self.assertIn('tests.record', out.getvalue())
+        self.assertIn(f'#{failed.pk}', err.getvalue())
+
+        call_command('jobs', drain=True, stdout=StringIO(), stderr=err)
+        self.assertEqual(calls, [4])
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+
+class WorkerPoolTest(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_after_commit(self):
+        pool = jobs.WorkerPool()
+        with mock.patch.object(jobs, 'pool', pool):
+            pool.start()
+            try:
+                jobs.enqueue('tests.record', value=5)
+                pool.queue.join()
+            finally:
+                pool.stop()
+        self.assertEqual(calls, [5])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOB_WORKERS=1, JOB_POLL_INTERVAL=0.05)
+    def test_table_polled_under_steady_traffic(self):
+        # Задача, не попавшая в очередь, и задача упавшего процесса
+        missed = Job(name='tests.record', run_after=timezone.now())
+        missed.arguments = {'value': 1}
+        missed.save()
+        stale = Job(
+            name='tests.record', status=Job.RUNNING,
+            run_after=timezone.now(),
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        stale.arguments = {'value': 2}
+        stale.save()
+        pool = jobs.WorkerPool()
+        pool.start()
+        try:
+            # Очередь всё время занята, так что get() не ждёт до таймаута
+            deadline = time.monotonic() + 5
+            while Job.objects.exists() and time.monotonic() < deadline:
+                pool.submit(0)
+                time.sleep(0.01)
+        finally:
+            pool.stop()
+        self.assertEqual(sorted(calls), [1, 2])
@@ -0,0 +1,80 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import jobs
+from ..mail import send_bulk
+from ..models import Job
+
+User = get_user_model()
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@override_settings(EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+                   EMAIL_QUEUE_BACKEND=LOCMEM_BACKEND)
+class QueuedEmailTest(TestCase):
+    def test_message_sent_by_job(self):
+        message = mail.EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            headers={'X-Tag': 'test'},
+        )
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        self.assertEqual(message.send(), 1)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(Job.objects.count(), 1)
+
+        jobs.run_pending()
+        sent, = mail.outbox
+        self.assertEqual(sent.subject, 'Тема')
+        self.assertEqual(sent.to, ['to@example.com'])
+        self.assertEqual(sent.extra_headers, {'X-Tag': 'test'})
+        self.assertEqual(sent.alternatives, [('<p>Текст</p>', 'text/html')])
+
+    def test_password_reset_is_queued(self):
+        User.objects.create_user(
+            username='auth', email='auth@example.com', password='pass'
+        )
+        response = self.client.post(
+            reverse('users:password_reset'), {'email': 'auth@example.com'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        jobs.run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('/auth/reset/', mail.outbox[0].body)
+
+    def test_bulk_uses_connection_per_batch(self):
+        messages = (
+            mail.EmailMessage('Объявление', 'Текст', to=[f'{i}@example.com'])
+            for i in range(5)
+        )
+        self.assertEqual(send_bulk(messages, size=2), 5)
+        self.assertEqual(Job.objects.count(), 3)
+        with mock.patch('core.mail.get_connection',
+                        wraps=mail.get_connection) as get_connection:
+            jobs.run_pending()
+        self.assertEqual(get_connection.call_count, 3)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_attachments_rejected(self):
+        message = mail.EmailMessage('Тема', 'Текст', to=['to@example.com'])
+        message.attach('file.txt', 'содержимое', 'text/plain')
+        with self.assertRaises(ValueError):
+            message.send()
+
+    def test_announce_command(self):
+        User.objects.create_user(username='first', email='1@example.com')
+        User.objects.create_user(username='second', email='2@example.com')
+        User.objects.create_user(username='silent')
+        call_command('announce', 'Новости', 'Текст', stdout=StringIO())
+        jobs.run_pending()
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['1@example.com', '2@example.com'],
+        )
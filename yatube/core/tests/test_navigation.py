@@ -0,0 +1,42 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.tests.fixtures import create_author
+
+from ..navigation import nav_urls
+from ..templatetags.navigation import _cached_header
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class HeaderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+
+    def setUp(self):
+        _cached_header.cache_clear()
+
+    def test_urls_match_reverse(self):
+        self.assertEqual(nav_urls()['index'], reverse('posts:index'))
+        self.assertEqual(nav_urls()['logout'], reverse('users:logout'))
+
+    def test_header_rendered_once_per_key(self):
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('about:author'))
+        info = _cached_header.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+    def test_header_depends_on_user_and_page(self):
+        response = self.client.get(reverse('about:author'))
+        self.assertContains(response, reverse('users:signup'))
+        self.assertNotContains(response, reverse('posts:post_create'))
+        self.assertContains(
+            response, 'nav-link active', count=1
+        )
+
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, reverse('posts:post_create'))
+        self.assertContains(response, 'Пользователь: auth')
+        self.assertNotContains(response, 'nav-link active')
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from ..template_warmup import warm_templates
+
+
+def templates_setting(directory, loaders):
+    return [{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [directory],
+        'OPTIONS': {'loaders': loaders},
+    }]
+
+
+class WarmTemplatesTest(SimpleTestCase):
+    @override_settings(TEMPLATES=templates_setting(
+        settings.TEMPLATES_DIR,
+        [('django.template.loaders.cached.Loader',
+          settings.TEMPLATE_LOADERS)],
+    ))
+    def test_templates_stored_in_cached_loader(self):
+        loaded, errors = warm_templates()
+        self.assertEqual(errors, {})
+        self.assertIn('includes/header.html', loaded)
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('base.html', loader.get_template_cache)
+
+    def test_syntax_errors_reported(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'ok.html'), 'w') as template:
+                template.write('{{ value }}')
+            with open(os.path.join(directory, 'bad.html'), 'w') as template:
+                template.write('{% if %}')
+            with override_settings(TEMPLATES=templates_setting(
+                directory, ['django.template.loaders.filesystem.Loader']
+            )):
+                loaded, errors = warm_templates()
+                with self.assertRaises(CommandError):
+                    call_command('warm_templates', stderr=StringIO())
+        self.assertEqual(loaded, ['ok.html'])
+        self.assertEqual(list(errors), ['bad.html'])
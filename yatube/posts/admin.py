@@ -1,20 +1,83 @@
 from django.conf import settings
 from django.contrib import admin
+from django.core.cache import cache
+from django.forms.models import BaseModelFormSet
 
+from .cache_keys import GROUP_CHOICES_KEY
+from .counters import checked_total_post_count
 from .models import Group, Post
+from .paginator import DeferredJoinPaginator
+from .search import get_backend as get_search_backend
+
+
+def group_choices():
+    """Варианты выпадающего списка групп, общие для всех строк админки.
+
+    Список хранится в кеше и сбрасывается при изменении групп.
+    """
+    choices = cache.get(GROUP_CHOICES_KEY)
+    if choices is None:
+        choices = [('', '---------')] + list(
+            Group.objects.values_list('pk', 'title')
+        )
+        cache.set(GROUP_CHOICES_KEY, choices, None)
+    return choices
+
+
+class SharedGroupChoicesFormSet(BaseModelFormSet):
+    """Formset списка постов: строки не запрашивают группы сами."""
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        form.fields['group'].choices = self.group_choices
+        return form
+
+    @property
+    def group_choices(self):
+        if not hasattr(self, '_group_choices'):
+            self._group_choices = group_choices()
+        return self._group_choices
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     # Перечисляем поля, которые должны отображаться в админке
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
+    # Автор и группа выбираются вместе с постами одним запросом
+    list_select_related = ('author', 'group')
     # позволит изменять поле group в любом посте
     list_editable = ('group',)
-    # Добавляем интерфейс для поиска по тексту постов
+    # Добавляем интерфейс для поиска по тексту постов;
+    # ищет полнотекстовый индекс (см. get_search_results)
     search_fields = ('text',)
     # Добавляем возможность фильтрации по дате
     list_filter = ('pub_date',)
     empty_value_display = settings.EMPTY_VALUE
+    # Не считаем все посты ещё раз ради «N из M»
+    show_full_result_count = False
+    paginator = DeferredJoinPaginator
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # Без фильтров и поиска число постов берём из счётчиков,
+        # пока они сходятся с таблицей
+        count = None
+        if not queryset.query.where:
+            count = checked_total_post_count(queryset)
+        return self.paginator(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page, count=count,
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо text LIKE '%q%' по всей таблице - поисковый индекс
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter(queryset, search_term), False
+
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs.setdefault('formset', SharedGroupChoicesFormSet)
+        return super().get_changelist_formset(request, **kwargs)
 
 
 admin.site.register(Group)
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        # Подключаем обработчики сигналов модели Post
+        # и регистрируем фоновые задачи
+        from . import jobs, signals  # noqa: F401
@@ -0,0 +1,12 @@
+"""Асинхронные варианты страниц только для чтения (для ASGI).
+
+Включаются настройкой ASYNC_VIEWS, её выставляет yatube/asgi.py.
+"""
+from core.async_views import async_view
+
+from . import views
+
+index = async_view(views.index)
+group_posts = async_view(views.group_posts)
+profile = async_view(views.profile)
+post_detail = async_view(views.post_detail)
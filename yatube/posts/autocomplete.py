@@ -0,0 +1,202 @@
+"""Автодополнение групп и авторов по префиксу без запросов к БД.
+
+Индекс - отсортированный список (термин, вид, id), в котором нужный
+префикс ищется бинарным поиском. Он строится при первом обращении,
+обновляется сигналами сохранения Group и User и целиком перестраивается
+раз в AUTOCOMPLETE_REBUILD_SECONDS, чтобы подтянуть изменения,
+сделанные другими процессами. Перестройка идёт в отдельном потоке,
+по одной за раз; запросы тем временем ищут по старому индексу.
+
+В индекс попадают только активные пользователи без прав персонала:
+подсказки доступны всем, в том числе анонимам.
+"""
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.urls import NoReverseMatch, reverse
+
+from .models import Group
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+GROUP = 'group'
+USER = 'user'
+KINDS = (GROUP, USER)
+DEFAULT_LIMIT = 10
+DEFAULT_REBUILD_SECONDS = 60 * 10
+
+
+def normalize(text):
+    """Приводит строку к виду для сравнения: регистр, ё, пробелы."""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return ' '.join(text.replace('ё', 'е').split())
+
+
+def _url(view_name, arg):
+    # Старые группы могут иметь slug, не подходящий под URL
+    try:
+        return reverse(view_name, args=(arg,))
+    except NoReverseMatch:
+        return None
+
+
+def group_entry(group):
+    return {
+        'kind': GROUP,
+        'id': group.pk,
+        'label': group.title,
+        'url': _url('posts:group_list', group.slug),
+        'terms': {normalize(group.title), normalize(group.slug)},
+    }
+
+
+def listed_users():
+    return User.objects.filter(
+        is_active=True, is_staff=False, is_superuser=False
+    )
+
+
+def is_listed(user):
+    """Показывать ли пользователя в подсказках."""
+    return user.is_active and not user.is_staff and not user.is_superuser
+
+
+def user_entry(user):
+    full_name = user.get_full_name()
+    return {
+        'kind': USER,
+        'id': user.pk,
+        'label': full_name or user.username,
+        'url': _url('posts:profile', user.username),
+        'terms': {normalize(user.username), normalize(full_name)} - {''},
+    }
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._keys = []
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        self._rebuilding = False
+        self._built_at = None
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def build(self):
+        with self._build_lock:
+            entries = [
+                group_entry(group)
+                for group in Group.objects.only('pk', 'title', 'slug')
+            ]
+            entries += [
+                user_entry(user) for user in listed_users().only(
+                    'pk', 'username', 'first_name', 'last_name'
+                )
+            ]
+            keys = sorted(
+                (term, entry['kind'], entry['id'])
+                for entry in entries for term in entry['terms']
+            )
+            with self._lock:
+                self._keys = keys
+                self._entries = {
+                    (entry['kind'], entry['id']): entry for entry in entries
+                }
+                self._built_at = time.monotonic()
+
+    def _rebuild(self):
+        try:
+            self.build()
+        except Exception:
+            # Поиск продолжит работать по старому индексу
+            logger.exception('Индекс автодополнения не перестроен')
+        finally:
+            self._rebuilding = False
+            connections.close_all()
+
+    def _ensure_fresh(self):
+        if self._built_at is None:
+            # Первое построение ждут все: искать ещё не по чему
+            with self._build_lock:
+                if self._built_at is None:
+                    self.build()
+            return
+        max_age = getattr(
+            settings, 'AUTOCOMPLETE_REBUILD_SECONDS', DEFAULT_REBUILD_SECONDS
+        )
+        if time.monotonic() - self._built_at <= max_age:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(
+            target=self._rebuild, name='autocomplete-rebuild', daemon=True,
+        ).start()
+
+    def _remove(self, kind, pk):
+        entry = self._entries.pop((kind, pk), None)
+        if entry is None:
+            return
+        for term in entry['terms']:
+            position = bisect_left(self._keys, (term, kind, pk))
+            if self._keys[position:position + 1] == [(term, kind, pk)]:
+                del self._keys[position]
+
+    def update(self, entry):
+        """Добавляет или заменяет запись; до построения ничего не делает."""
+        if not self.is_built:
+            return
+        with self._lock:
+            self._remove(entry['kind'], entry['id'])
+            self._entries[entry['kind'], entry['id']] = entry
+            for term in entry['terms']:
+                insort(self._keys, (term, entry['kind'], entry['id']))
+
+    def remove(self, kind, pk):
+        if not self.is_built:
+            return
+        with self._lock:
+            self._remove(kind, pk)
+
+    def get(self, kind, pk):
+        self._ensure_fresh()
+        return self._entries.get((kind, pk))
+
+    def search(self, prefix, kind=None, limit=DEFAULT_LIMIT):
+        """Записи, один из терминов которых начинается с prefix."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_fresh()
+        with self._lock:
+            keys = self._keys
+            position = bisect_left(keys, (prefix,))
+            found = {}
+            while position < len(keys) and len(found) < limit:
+                term, entry_kind, pk = keys[position]
+                if not term.startswith(prefix):
+                    break
+                if kind in (None, entry_kind):
+                    found.setdefault(
+                        (entry_kind, pk), self._entries[entry_kind, pk]
+                    )
+                position += 1
+        return [
+            {key: value for key, value in entry.items() if key != 'terms'}
+            for entry in found.values()
+        ]
+
+
+index = PrefixIndex()
@@ -0,0 +1,9 @@
+"""Ключи кеша, которые пишут и сбрасывают разные модули posts."""
+
+# Варианты выпадающего списка групп в админке (posts.admin),
+# сбрасываются сигналами Group
+GROUP_CHOICES_KEY = 'admin:group_choices'
+
+# Метка «сумма счётчиков авторов совпадает с числом постов»
+# (posts.counters)
+COUNTERS_TRUSTED_KEY = 'counters:trusted'
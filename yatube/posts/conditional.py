@@ -0,0 +1,96 @@
+"""Условные GET-запросы (ETag / Last-Modified) для лент и поста.
+
+Валидаторы считаются без рендера шаблона: по версиям тегов кеша
+страниц (posts.page_cache), которые меняются при любом изменении
+постов и групп в своей области, а также переименовании их авторов
+и групп, и по edit_date поста. Страница зависит и от пользователя
+(шапка), поэтому он входит в ETag. Если клиент прислал актуальный
+валидатор, отдаётся 304 без вызова view.
+
+Версия тега, сброшенная в одном процессе, должна быть видна во всех
+остальных, иначе они ответят 304 на изменившуюся страницу. Поэтому
+валидаторы работают, только если версии тегов общие
+(page_cache.tags_shared()); иначе страницы отдаются как обычно.
+"""
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from . import page_cache
+
+
+def _user_key(request):
+    user = request.user
+    return str(user.pk) if user.is_authenticated else 'anonymous'
+
+
+def validators(request, tags, *parts, modified=None):
+    """(ETag, Last-Modified) для страницы с тегами tags.
+
+    parts - прочие значения, от которых зависит страница;
+    modified - собственная дата изменения объекта страницы.
+    """
+    versions = page_cache.tag_versions(tags)
+    digest = hashlib.md5(
+        ':'.join((*versions, *map(str, parts), _user_key(request))).encode()
+    ).hexdigest()
+    last_modified = page_cache.versions_modified(versions)
+    if modified is not None:
+        last_modified = max(last_modified, modified)
+    return quote_etag(digest), last_modified
+
+
+def conditional_page(*tag_templates):
+    """Декоратор view ленты: ETag и Last-Modified по версиям тегов.
+
+    Шаблоны тегов заполняются именованными аргументами view,
+    как в page_cache.cache_page.
+    """
+    def page_validators(request, *args, **kwargs):
+        # condition спрашивает ETag и Last-Modified по отдельности,
+        # считаем их один раз на запрос
+        if not hasattr(request, '_page_validators'):
+            request._page_validators = validators(
+                request, [tag.format(**kwargs) for tag in tag_templates]
+            )
+        return request._page_validators
+
+    conditional = condition(
+        etag_func=lambda *args, **kwargs: page_validators(
+            *args, **kwargs
+        )[0],
+        last_modified_func=lambda *args, **kwargs: page_validators(
+            *args, **kwargs
+        )[1],
+    )
+
+    def decorator(view):
+        conditional_view = conditional(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not page_cache.tags_shared():
+                return view(request, *args, **kwargs)
+            return conditional_view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def not_modified(request, etag, last_modified):
+    """Ответ 304 (или 412), если у клиента актуальная версия, иначе None."""
+    if not page_cache.tags_shared():
+        return None
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+
+
+def set_validators(response, etag, last_modified):
+    if not page_cache.tags_shared():
+        return response
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
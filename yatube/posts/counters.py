@@ -0,0 +1,157 @@
+from django.core.cache import cache
+from django.db.models import Count, F, Sum
+
+from .cache_keys import COUNTERS_TRUSTED_KEY
+from .models import AuthorStats, Group, Post
+
+# Как долго сумма счётчиков считается верной без сверки с COUNT(*):
+# так расхождение после записи в обход сигналов живёт не дольше часа
+TRUST_SECONDS = 60 * 60
+
+
+def _shift(queryset, delta):
+    if delta < 0:
+        # Пост мог не попасть в счётчик (bulk_create, loaddata):
+        # ниже нуля счётчик не уходит, а удаление поста не падает
+        queryset = queryset.filter(post_count__gte=-delta)
+    return queryset.update(post_count=F('post_count') + delta)
+
+
+def change_group_count(group_id, delta):
+    """Сдвигает счётчик постов группы на delta."""
+    if group_id is None:
+        return
+    _shift(Group.objects.filter(pk=group_id), delta)
+
+
+def change_author_count(author_id, delta):
+    """Сдвигает счётчик постов автора на delta.
+
+    Если строки статистики ещё нет, она создаётся с точным значением.
+    При удалении строку не создаём: автор может удаляться каскадом.
+    """
+    updated = _shift(
+        AuthorStats.objects.filter(author_id=author_id), delta
+    )
+    if not updated and delta > 0:
+        AuthorStats.objects.create(
+            author_id=author_id,
+            post_count=Post.objects.filter(author_id=author_id).count(),
+        )
+
+
+def author_post_count(author):
+    """Число постов автора без COUNT(*) по таблице постов.
+
+    Статистику стоит выбирать вместе с автором:
+    User.objects.select_related('post_stats').
+    """
+    try:
+        return author.post_stats.post_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def total_post_count():
+    """Общее число постов по счётчикам авторов.
+
+    Читает таблицу статистики (одна строка на автора)
+    вместо COUNT(*) по всей таблице постов.
+    """
+    return (
+        AuthorStats.objects.aggregate(total=Sum('post_count'))['total'] or 0
+    )
+
+
+def refresh_counters(author_ids=(), group_ids=()):
+    """Пересчитывает по таблице постов счётчики указанных авторов и групп.
+
+    Для записи в обход сигналов (импорт): заодно исправляет
+    расхождения, накопившиеся у этих авторов и групп раньше.
+    """
+    group_ids = [pk for pk in group_ids if pk is not None]
+    group_totals = dict(
+        Post.objects.filter(group_id__in=group_ids).order_by()
+        .values_list('group_id').annotate(total=Count('id'))
+    )
+    for group_id in group_ids:
+        Group.objects.filter(pk=group_id).update(
+            post_count=group_totals.get(group_id, 0)
+        )
+
+    author_totals = dict(
+        Post.objects.filter(author_id__in=author_ids).order_by()
+        .values_list('author_id').annotate(total=Count('id'))
+    )
+    existing = set(
+        AuthorStats.objects.filter(author_id__in=author_ids)
+        .values_list('author_id', flat=True)
+    )
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=author_id, post_count=total)
+        for author_id, total in author_totals.items()
+        if author_id not in existing
+    )
+    for author_id in existing:
+        AuthorStats.objects.filter(author_id=author_id).update(
+            post_count=author_totals.get(author_id, 0)
+        )
+
+
+def counters_trusted():
+    return bool(cache.get(COUNTERS_TRUSTED_KEY))
+
+
+def trust_counters():
+    cache.set(COUNTERS_TRUSTED_KEY, True, TRUST_SECONDS)
+
+
+def distrust_counters():
+    """Счётчики могли разойтись с таблицей (запись без сигналов)."""
+    cache.delete(COUNTERS_TRUSTED_KEY)
+
+
+def checked_total_post_count(posts):
+    """Общее число постов: по счётчикам, если им можно верить.
+
+    Иначе считает COUNT(*) по posts и, если сумма счётчиков
+    совпала с ним, снова начинает им доверять.
+    """
+    if counters_trusted():
+        return total_post_count()
+    count = posts.count()
+    if count == total_post_count():
+        trust_counters()
+    return count
+
+
+def rebuild_counters():
+    """Пересчитывает все счётчики по таблице постов.
+
+    Возвращает число обновлённых групп и авторов.
+    """
+    groups = Group.objects.annotate(total=Count('posts'))
+    for group in groups:
+        if group.post_count != group.total:
+            Group.objects.filter(pk=group.pk).update(post_count=group.total)
+
+    totals = dict(
+        Post.objects.order_by().values_list('author_id')
+        .annotate(total=Count('id'))
+    )
+    AuthorStats.objects.exclude(author_id__in=totals).delete()
+    existing = dict(
+        AuthorStats.objects.values_list('author_id', 'post_count')
+    )
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=author_id, post_count=total)
+        for author_id, total in totals.items()
+        if author_id not in existing
+    )
+    for author_id, total in totals.items():
+        if author_id in existing and existing[author_id] != total:
+            AuthorStats.objects.filter(author_id=author_id).update(
+                post_count=total
+            )
+    trust_counters()
+    return len(groups), len(totals)
@@ -0,0 +1,81 @@
+"""Потоковая выгрузка постов в JSON Lines и CSV.
+
+Посты читаются через iterator() пачками по CHUNK_SIZE (на PostgreSQL -
+серверным курсором) и сразу превращаются в строки вывода, так что
+память не растёт с размером выгрузки. Формат строк совпадает
+с форматом импорта (posts.importer), плюс id поста.
+"""
+import csv
+import json
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+FIELDS = ('id', 'text', 'author', 'group', 'pub_date')
+CHUNK_SIZE = 2000
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def parse_bound(value):
+    """Граница периода: дата (полночь) или дата и время ISO 8601."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Некорректная дата: {value}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_posts(group=None, author=None, since=None, until=None):
+    """Значения полей выгрузки; since включительно, until - нет."""
+    posts = Post.objects.order_by('id')
+    if group:
+        posts = posts.filter(group__slug=group)
+    if author:
+        posts = posts.filter(author__username=author)
+    if since:
+        posts = posts.filter(pub_date__gte=since)
+    if until:
+        posts = posts.filter(pub_date__lt=until)
+    return posts.values_list(
+        'id', 'text', 'author__username', 'group__slug', 'pub_date'
+    )
+
+
+class _Echo:
+    # Файловый объект для csv.writer, который просто отдаёт строку
+    def write(self, value):
+        return value
+
+
+def _jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n'
+
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_lines(posts, format='jsonl'):
+    """Строки выгрузки для значений, возвращённых filter_posts."""
+    rows = (
+        (post_id, text, author, group or '', pub_date.isoformat())
+        for post_id, text, author, group, pub_date
+        in posts.iterator(chunk_size=CHUNK_SIZE)
+    )
+    if format == 'csv':
+        return _csv_lines(rows)
+    return _jsonl_lines(rows)
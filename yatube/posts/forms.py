@@ -1,11 +1,50 @@
 from django import forms
+from django.forms.utils import flatatt
+from django.urls import reverse_lazy
+from django.utils.html import format_html
 
+from . import autocomplete
 from .models import Post
 
 
+class GroupAutocompleteWidget(forms.Widget):
+    """Поле выбора группы с подсказками вместо <select> всех групп.
+
+    id группы хранится в скрытом поле, название подставляется
+    из индекса автодополнения без запроса к БД.
+    """
+
+    autocomplete_url = reverse_lazy('posts:autocomplete')
+
+    def id_for_label(self, id_):
+        return f'{id_}_search' if id_ else id_
+
+    def render(self, name, value, attrs=None, renderer=None):
+        attrs = self.build_attrs(self.attrs, attrs)
+        hidden_id = attrs.pop('id', f'id_{name}')
+        try:
+            entry = autocomplete.index.get(autocomplete.GROUP, int(value))
+        except (TypeError, ValueError):
+            entry = None
+        return format_html(
+            '<input type="hidden" name="{}" id="{}" value="{}">'
+            '<input type="text" id="{}" list="{}"{} value="{}" '
+            'autocomplete="off" data-autocomplete-url="{}" '
+            'data-autocomplete-kind="{}" data-autocomplete-target="{}">'
+            '<datalist id="{}"></datalist>',
+            name, hidden_id, '' if value is None else value,
+            self.id_for_label(hidden_id), f'{hidden_id}_options',
+            flatatt(attrs), entry['label'] if entry else '',
+            self.autocomplete_url, autocomplete.GROUP, hidden_id,
+            f'{hidden_id}_options',
+        )
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         # укажем модель, с которой связана создаваемая форма
         model = Post
         # укажем, какие поля должны быть видны в форме и в каком порядке
         fields = ('text', 'group')
+        # группа выбирается подсказками, а не списком всех групп
+        widgets = {'group': GroupAutocompleteWidget}
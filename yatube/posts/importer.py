@@ -0,0 +1,249 @@
+"""Массовый импорт постов из JSON Lines и CSV.
+
+Строка импорта - словарь с ключами text, author (username),
+group (slug, необязательно) и pub_date (ISO 8601, необязательно).
+Строки проверяются по правилам PostForm, авторы и группы ищутся
+по словарям, которые дозаполняются одним запросом на пачку, а посты
+вставляются через bulk_create. Сигналы при этом не срабатывают,
+поэтому счётчики, поисковый индекс, кеш страниц и лента главной
+обновляются один раз на пачку. Счётчики затронутых авторов и групп
+пересчитываются по таблице, а в индекс попадают только посты,
+id которых вернула сама вставка.
+
+bulk_create на SQLite вставляет не больше 199 постов
+за запрос и готовит каждое поле каждой модели отдельно, поэтому
+пачка вставляется одним executemany с заранее подготовленными
+значениями: так импорт в разы быстрее.
+
+Ленты и кеш страниц сбрасываются в кеше того процесса, который
+импортирует. Сайт увидит сброс, только если кеш общий (Redis,
+Memcached); с LocMemCache команда import_posts предупреждает, что
+импортированные посты появятся в лентах не раньше, чем истечёт
+TIMELINE_TIMEOUT, или после перезапуска сайта.
+"""
+import csv
+import json
+from collections import Counter, namedtuple
+from dataclasses import dataclass, field
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import page_cache, timeline
+from .counters import refresh_counters
+from .forms import PostForm
+from .models import Group, Post
+from .search import get_backend as get_search_backend
+
+User = get_user_model()
+
+FORMATS = ('jsonl', 'csv')
+DEFAULT_BATCH_SIZE = 5000
+
+
+# Поля, которые заполняет импорт, в порядке колонок INSERT
+ImportedPost = namedtuple(
+    'ImportedPost', ('text', 'pub_date', 'author_id', 'group_id')
+)
+
+
+def read_rows(stream, format='jsonl'):
+    """Строки файла импорта как словари, пустые строки JSONL пропускаются.
+
+    Ошибка разбора JSON не прерывает чтение: строка отдаётся
+    как словарь с ключом '__error__' и попадает в отчёт.
+    """
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            row = {'__error__': f'Некорректный JSON: {error}'}
+        if not isinstance(row, dict):
+            row = {'__error__': 'Строка должна быть JSON-объектом'}
+        yield row
+
+
+def _name(row, key):
+    value = row.get(key)
+    return value if isinstance(value, str) and value else None
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    # (номер строки, {поле: [ошибки]})
+    errors: list = field(default_factory=list)
+
+
+class PostImporter:
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.authors = {}
+        self.groups = {}
+        self.text_field = PostForm.base_fields['text']
+
+    def _resolve(self, rows):
+        """Дозаполняет словари авторов и групп по именам из пачки."""
+        usernames = {_name(row, 'author') for row in rows}
+        usernames -= {None, *self.authors}
+        if usernames:
+            self.authors.update(
+                User.objects.filter(username__in=usernames)
+                .values_list('username', 'id')
+            )
+        slugs = {_name(row, 'group') for row in rows}
+        slugs -= {None, *self.groups}
+        if slugs:
+            self.groups.update(
+                Group.objects.filter(slug__in=slugs).values_list('slug', 'id')
+            )
+
+    def _clean_pub_date(self, value):
+        if not value:
+            return None
+        try:
+            pub_date = parse_datetime(str(value))
+        except ValueError:
+            pub_date = None
+        if pub_date is None:
+            raise ValidationError('Некорректная дата')
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
+
+    def clean(self, row):
+        """Пост из строки импорта или ValidationError со словарём ошибок."""
+        if '__error__' in row:
+            raise ValidationError({'__all__': [row['__error__']]})
+        errors = {}
+        try:
+            text = self.text_field.clean(row.get('text'))
+        except ValidationError as error:
+            errors['text'] = error.messages
+        author_id = self.authors.get(_name(row, 'author'))
+        if author_id is None:
+            errors['author'] = ['Автор не найден']
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(_name(row, 'group'))
+            if group_id is None:
+                errors['group'] = ['Группа не найдена']
+        try:
+            pub_date = self._clean_pub_date(row.get('pub_date'))
+        except ValidationError as error:
+            errors['pub_date'] = error.messages
+        if errors:
+            raise ValidationError(errors)
+        return ImportedPost(text, pub_date, author_id, group_id)
+
+    def _insert(self, posts):
+        """Вставляет посты и возвращает их id.
+
+        Вызывается внутри транзакции.
+        """
+        opts = Post._meta
+        date_field = opts.get_field('pub_date')
+        now = date_field.get_db_prep_save(timezone.now(), connection)
+        columns = ', '.join(
+            connection.ops.quote_name(opts.get_field(name).column)
+            for name in ('text', 'pub_date', 'edit_date', 'author', 'group')
+        )
+        sql = (
+            f'INSERT INTO {connection.ops.quote_name(opts.db_table)} '
+            f'({columns}) VALUES (%s, %s, %s, %s, %s)'
+        )
+        rows = [
+            (
+                post.text,
+                now if post.pub_date is None
+                else date_field.get_db_prep_save(post.pub_date, connection),
+                now,
+                post.author_id,
+                post.group_id,
+            )
+            for post in posts
+        ]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                # Писатель в SQLite один: после первой вставки до конца
+                # транзакции никто не вставит строк между нашими,
+                # так что id пачки идут подряд до last_insert_rowid()
+                cursor.executemany(sql, rows)
+                cursor.execute('SELECT last_insert_rowid()')
+                last_id = cursor.fetchone()[0]
+                return range(last_id - len(rows) + 1, last_id + 1)
+            if connection.features.can_return_columns_from_insert:
+                pk = connection.ops.quote_name(opts.pk.column)
+                ids = []
+                for row in rows:
+                    cursor.execute(f'{sql} RETURNING {pk}', row)
+                    ids.append(cursor.fetchone()[0])
+                return ids
+            ids = []
+            for row in rows:
+                cursor.execute(sql, row)
+                ids.append(cursor.lastrowid)
+            return ids
+
+    def _save(self, posts):
+        with transaction.atomic():
+            ids = self._insert(posts)
+            authors = Counter(post.author_id for post in posts)
+            groups = Counter(post.group_id for post in posts)
+            refresh_counters(authors, groups)
+            if isinstance(ids, range):
+                # Сплошной диапазон - без тысяч параметров в запросе
+                imported = Post.objects.filter(id__range=(ids[0], ids[-1]))
+            else:
+                imported = Post.objects.filter(id__in=ids)
+            get_search_backend().index_posts(imported)
+        # Даты импортированных постов произвольные: ленты строим заново
+        timeline.home.invalidate()
+        timeline.invalidate_scopes(authors, groups)
+        usernames = {id: name for name, id in self.authors.items()}
+        slugs = {id: slug for slug, id in self.groups.items()}
+        page_cache.invalidate(
+            page_cache.INDEX_TAG,
+            *(page_cache.AUTHOR_TAG.format(username=usernames[author_id])
+              for author_id in authors),
+            *(page_cache.GROUP_TAG.format(slug=slugs[group_id])
+              for group_id in groups if group_id is not None),
+        )
+
+    def run(self, rows):
+        """Импортирует строки; неверные пропускаются и попадают в отчёт."""
+        result = ImportResult()
+        batch = []
+        for number, row in enumerate(rows, start=1):
+            batch.append((number, row))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch, result)
+                batch = []
+        if batch:
+            self._import_batch(batch, result)
+        return result
+
+    def _import_batch(self, batch, result):
+        self._resolve([row for _, row in batch])
+        posts = []
+        for number, row in batch:
+            try:
+                posts.append(self.clean(row))
+            except ValidationError as error:
+                result.errors.append((number, error.message_dict))
+        if posts:
+            self._save(posts)
+            result.created += len(posts)
+
+
+def import_posts(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Импортирует посты из итерируемого набора словарей."""
+    return PostImporter(batch_size).run(rows)
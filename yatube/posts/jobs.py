@@ -0,0 +1,18 @@
+"""Фоновые задачи постов (см. core.jobs)."""
+from core import jobs
+
+from .models import Post
+from .search import get_backend as get_search_backend
+
+
+@jobs.register('posts.index_post')
+def index_post(post_id):
+    # Пост могли удалить, пока задача ждала очереди
+    post = Post.objects.filter(pk=post_id).only('id', 'text').first()
+    if post is not None:
+        get_search_backend().index_post(post)
+
+
+@jobs.register('posts.remove_post')
+def remove_post(post_id):
+    get_search_backend().remove_post(post_id)
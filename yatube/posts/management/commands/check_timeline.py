@@ -0,0 +1,56 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.page_cache import tags_shared
+from posts.timeline import by_name
+
+# Ленты сайта видны команде, только если кеш общий для всех процессов
+NOT_SHARED = ('Кеш у каждого процесса свой (LocMemCache): команда не '
+              'видит лент сайта. Нужен общий кеш или PAGE_CACHE_SHARED=True')
+
+
+class Command(BaseCommand):
+    help = 'Сверяет материализованную ленту с таблицей постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='лента автора (username)')
+        parser.add_argument('--group', help='лента группы (slug)')
+        parser.add_argument('--fix', action='store_true',
+                            help='перестроить ленту, если она расходится')
+
+    def handle(self, *args, **options):
+        if not tags_shared():
+            raise CommandError(NOT_SHARED)
+        try:
+            timeline = by_name(options['author'], options['group'])
+        except ObjectDoesNotExist as error:
+            raise CommandError(error)
+        result = timeline.check()
+        if result is None:
+            if not options['fix']:
+                raise CommandError(
+                    f'Ленты {timeline.key} нет в кеше: сверять нечего'
+                )
+            timeline.load()
+            self.stdout.write(
+                self.style.SUCCESS(f'Лента {timeline.key} построена')
+            )
+            return
+        extra, missing = result
+        if not extra and not missing:
+            self.stdout.write(
+                self.style.SUCCESS(f'Лента {timeline.key} согласована')
+            )
+            return
+        self.stderr.write(
+            f'Лишние посты: {sorted(pk for _, pk in extra)}\n'
+            f'Недостающие посты: {sorted(pk for _, pk in missing)}'
+        )
+        if not options['fix']:
+            raise CommandError(
+                f'Лента {timeline.key} расходится с таблицей постов'
+            )
+        timeline.load()
+        self.stdout.write(
+            self.style.SUCCESS(f'Лента {timeline.key} перестроена')
+        )
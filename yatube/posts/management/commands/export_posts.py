@@ -0,0 +1,46 @@
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exporter import (CONTENT_TYPES, export_lines, filter_posts,
+                            parse_bound)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты в JSON Lines или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-',
+                            help='файл выгрузки, "-" - стандартный вывод')
+        parser.add_argument('--format', choices=CONTENT_TYPES,
+                            help='формат, по умолчанию - по расширению')
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--since', help='опубликованные с этой даты')
+        parser.add_argument('--until', help='опубликованные до этой даты')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        try:
+            since, until = (
+                parse_bound(options[name]) if options[name] else None
+                for name in ('since', 'until')
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        posts = filter_posts(
+            group=options['group'], author=options['author'],
+            since=since, until=until,
+        )
+        if path == '-':
+            # Строки выгрузки уже заканчиваются переводом строки
+            self.stdout.ending = ''
+            output = nullcontext(self.stdout)
+        else:
+            output = open(path, 'w', encoding='utf-8', newline='')
+        with output as lines:
+            for line in export_lines(posts, format):
+                lines.write(line)
@@ -0,0 +1,64 @@
+import sys
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import DEFAULT_BATCH_SIZE, FORMATS, import_posts, read_rows
+from posts.page_cache import tags_shared
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из файла JSON Lines или CSV '
+        '(поля text, author, group, pub_date)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-',
+                            help='файл импорта, "-" - стандартный ввод')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='формат файла, по умолчанию - по расширению')
+        parser.add_argument('--batch-size', type=int,
+                            default=DEFAULT_BATCH_SIZE,
+                            help='постов в одной транзакции')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        if path == '-':
+            stream = nullcontext(sys.stdin)
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(error)
+
+        if not tags_shared():
+            # Команда сбросит ленты и страницы только в своём кеше
+            self.stderr.write(self.style.WARNING(
+                'Кеш у каждого процесса свой (LocMemCache): сайт покажет '
+                'импортированные посты в лентах после истечения '
+                'TIMELINE_TIMEOUT или перезапуска'
+            ))
+
+        started = time.perf_counter()
+        with stream as rows:
+            result = import_posts(
+                read_rows(rows, format), options['batch_size']
+            )
+        seconds = time.perf_counter() - started
+
+        for number, errors in result.errors:
+            for field, messages in errors.items():
+                self.stderr.write(
+                    f'Строка {number}, {field}: {" ".join(messages)}'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {result.created} за {seconds:.2f} с, '
+            f'пропущено строк: {len(result.errors)}'
+        ))
@@ -0,0 +1,30 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.page_cache import tags_shared
+from posts.timeline import by_name
+
+# Ленты сайта видны команде, только если кеш общий для всех процессов
+NOT_SHARED = ('Кеш у каждого процесса свой (LocMemCache): команда не '
+              'видит лент сайта. Нужен общий кеш или PAGE_CACHE_SHARED=True')
+
+
+class Command(BaseCommand):
+    help = 'Строит материализованную ленту заново'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='лента автора (username)')
+        parser.add_argument('--group', help='лента группы (slug)')
+
+    def handle(self, *args, **options):
+        if not tags_shared():
+            raise CommandError(NOT_SHARED)
+        try:
+            timeline = by_name(options['author'], options['group'])
+        except ObjectDoesNotExist as error:
+            raise CommandError(error)
+        state = timeline.load()
+        self.stdout.write(self.style.SUCCESS(
+            f'Лента {timeline.key} перестроена: '
+            f'постов {len(state["entries"])}'
+        ))
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_counters(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+
+    for group in Group.objects.annotate(total=models.Count('posts')):
+        Group.objects.filter(pk=group.pk).update(post_count=group.total)
+
+    totals = (
+        Post.objects.order_by().values_list('author_id')
+        .annotate(total=models.Count('id'))
+    )
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=author_id, post_count=total)
+        for author_id, total in totals
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0002_auto_20230207_2142'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False,
+                                              verbose_name='Число постов'),
+        ),
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True, related_name='post_stats',
+                    serialize=False, to=settings.AUTH_USER_MODEL,
+                    verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(
+                    default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('posts', '0003_post_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='edit_date',
+            field=models.DateTimeField(auto_now=True,
+                                       default=django.utils.timezone.now,
+                                       verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+    ]
@@ -10,6 +10,10 @@ class Group(models.Model):
         verbose_name='URL группы', max_length=200, unique=True
     )
     description = models.TextField(verbose_name='Описание')
+    # Денормализованный счётчик постов группы, его ведут сигналы Post
+    post_count = models.PositiveIntegerField(
+        verbose_name='Число постов', default=0, editable=False
+    )
 
     class Meta:
         verbose_name = 'Группа постов'
@@ -19,6 +23,29 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    # Поля, которые выводит карточка поста в ленте
+    # (posts/includes/post.html): остальные колонки не выбираем.
+    FEED_FIELDS = (
+        'id', 'text', 'pub_date', 'edit_date',
+        'author', 'author__username',
+        'author__first_name', 'author__last_name',
+        'group', 'group__slug', 'group__title',
+    )
+
+    def for_feed(self):
+        """Посты для ленты вместе с автором и группой одним запросом."""
+        return self.select_related('author', 'group').only(*self.FEED_FIELDS)
+
+    def for_detail(self):
+        """Пост с автором, группой и счётчиком постов автора.
+
+        Всё нужное странице поста и форме редактирования
+        выбирается одним запросом.
+        """
+        return self.select_related('author__post_stats', 'group')
+
+
 class Post(models.Model):
     DESCRIPTION_TEMPLATE = ('Автор: {author}; '
                             'Пост: {text}; '
@@ -29,6 +56,10 @@ class Post(models.Model):
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации', auto_now_add=True
     )
+    # Меняется при каждом сохранении: служит версией поста для кешей
+    edit_date = models.DateTimeField(
+        verbose_name='Дата изменения', auto_now=True
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='posts',
         verbose_name='Автор поста', )
@@ -37,8 +68,26 @@ class Post(models.Model):
         null=True, verbose_name='Группа',
         help_text='Группа, к которой будет относиться пост', )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
+        # Индексы повторяют порядок лент (-pub_date, -id), чтобы
+        # страница ленты читалась из индекса без сортировки
+        indexes = (
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_feed_idx',
+            ),
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_idx',
+            ),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -49,3 +98,21 @@ class Post(models.Model):
             text=self.text[:15],
             pub_date=self.pub_date.strftime('%d.%m.%Y')
         )
+
+
+class AuthorStats(models.Model):
+    """Денормализованная статистика автора."""
+
+    author = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='post_stats', verbose_name='Автор', )
+    post_count = models.PositiveIntegerField(
+        verbose_name='Число постов', default=0
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author_id}: {self.post_count}'
@@ -0,0 +1,163 @@
+"""Кеш целых страниц лент для анонимных посетителей.
+
+Каждая страница помечается тегами (index, group:<slug>, author:<username>).
+У тега в кеше хранится версия, которая входит в ключ страницы: чтобы
+сбросить все страницы тега, достаточно выдать ему новую версию.
+Версии тегов служат и валидаторами ETag/Last-Modified (posts.conditional).
+
+Страница для кеша строится по основной базе, а не по реплике: иначе
+отставшая реплика закрепила бы в кеше старую страницу на весь
+PAGE_CACHE_TIMEOUT.
+
+Версии тегов и страницы живут в кеше по умолчанию, поэтому он должен
+быть общим для всех процессов сайта (Redis, Memcached). LocMemCache
+у каждого процесса свой: сброс тега в одном процессе не дойдёт
+до остальных, так что с ним сайт должен работать одним процессом.
+
+Версии тегов живут PAGE_CACHE_TAG_TIMEOUT, а не вечно: версию получает
+и тег страницы 404 (/profile/<кто угодно>/), и такие ключи не должны
+копиться в кеше. Истёкшая версия просто заменяется новой: страницы
+старой версии больше не найдутся, а ETag сменится - клиент один раз
+получит 200 вместо 304.
+"""
+import hashlib
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+
+from core.db import use_primary
+
+PAGE_KEY = 'page_cache:page:{view}:{versions}:{path}'
+TAG_KEY = 'page_cache:tag:{tag}'
+DEFAULT_TIMEOUT = 60 * 5
+DEFAULT_TAG_TIMEOUT = 60 * 60 * 24
+
+INDEX_TAG = 'index'
+GROUP_TAG = 'group:{slug}'
+AUTHOR_TAG = 'author:{username}'
+
+# Счётчики попаданий и промахов текущего процесса: {(view, 'hit'): n}
+_stats = Counter()
+
+
+def stats():
+    """Возвращает попадания и промахи кеша по каждому view."""
+    result = {}
+    for (view, outcome), value in _stats.items():
+        result.setdefault(view, {'hit': 0, 'miss': 0})[outcome] = value
+    return result
+
+
+def reset_stats():
+    _stats.clear()
+
+
+def _new_version():
+    # Время выдачи версии (мкс, hex) служит Last-Modified страниц тега
+    return f'{time.time_ns() // 1000:x}-{uuid.uuid4().hex[:6]}'
+
+
+def tags_shared():
+    """Видят ли все процессы сайта одни и те же версии тегов.
+
+    Настройка PAGE_CACHE_SHARED задаёт это явно; если она None,
+    общим считается любой бэкенд кеша, кроме LocMemCache и DummyCache.
+    """
+    shared = getattr(settings, 'PAGE_CACHE_SHARED', None)
+    if shared is None:
+        backend = caches[DEFAULT_CACHE_ALIAS]
+        shared = not isinstance(backend, (LocMemCache, DummyCache))
+    return shared
+
+
+def _tag_timeout():
+    # Версия должна пережить закешированные с ней страницы
+    page_timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+    return max(
+        getattr(settings, 'PAGE_CACHE_TAG_TIMEOUT', DEFAULT_TAG_TIMEOUT),
+        2 * page_timeout,
+    )
+
+
+def tag_versions(tags):
+    """Текущие версии тегов; отсутствующим выдаются новые."""
+    keys = [TAG_KEY.format(tag=tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        # add не перезапишет версию, выданную параллельным запросом
+        for key, version in missing.items():
+            if not cache.add(key, version, timeout=_tag_timeout()):
+                version = cache.get(key, version)
+            versions[key] = version
+    return [versions[key] for key in keys]
+
+
+def versions_modified(versions):
+    """Момент выдачи самой новой из версий тегов."""
+    micros = max(int(version.split('-')[0], 16) for version in versions)
+    return datetime.fromtimestamp(micros / 1_000_000, tz=timezone.utc)
+
+
+def invalidate(*tags):
+    """Сбрасывает все закешированные страницы с указанными тегами."""
+    cache.set_many(
+        {TAG_KEY.format(tag=tag): _new_version() for tag in tags},
+        timeout=_tag_timeout(),
+    )
+
+
+def _page_key(view_name, request, tags):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(
+        view=view_name, versions='.'.join(tag_versions(tags)), path=path
+    )
+
+
+def cache_page(*tag_templates):
+    """Кеширует ответ view для анонимных GET-запросов.
+
+    Шаблоны тегов заполняются именованными аргументами view:
+    cache_page(GROUP_TAG) для group_posts(request, slug).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+            if (
+                not timeout
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+
+            tags = [tag.format(**kwargs) for tag in tag_templates]
+            key = _page_key(view.__name__, request, tags)
+            cached = cache.get(key)
+            if cached is not None:
+                _stats[view.__name__, 'hit'] += 1
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['X-Page-Cache'] = 'hit'
+                return response
+
+            _stats[view.__name__, 'miss'] += 1
+            use_primary(request)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(
+                    key, (response.content, response['Content-Type']),
+                    timeout,
+                )
+            response['X-Page-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,217 @@
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+# Порядок ленты: сначала новые посты, при равной дате - больший id.
+# Пара (pub_date, id) однозначно задаёт позицию поста в ленте.
+FEED_ORDERING = ('-pub_date', '-id')
+CURSOR_SEPARATOR = '|'
+# Сколько соседних страниц показывать вокруг текущей и у краёв
+PAGES_ON_EACH_SIDE = 3
+PAGES_ON_ENDS = 1
+
+
+class InvalidCursor(ValueError):
+    """Курсор не удалось разобрать."""
+
+
+def encode_cursor(post) -> str:
+    """Упаковывает позицию поста в непрозрачный токен для URL."""
+    raw = f'{post.pub_date.isoformat()}{CURSOR_SEPARATOR}{post.pk}'
+    return urlsafe_base64_encode(force_bytes(raw))
+
+
+def decode_cursor(token: str):
+    """Возвращает пару (pub_date, id), записанную в токене."""
+    try:
+        raw = urlsafe_base64_decode(token).decode()
+        pub_date, pk = raw.rsplit(CURSOR_SEPARATOR, 1)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise InvalidCursor(token)
+    if pub_date is None:
+        raise InvalidCursor(token)
+    return pub_date, pk
+
+
+class NumberedPage(Page):
+    """Страница постраничного режима с сокращённой навигацией.
+
+    Навигация не растёт с числом страниц: в ней не больше
+    2 * (PAGES_ON_EACH_SIDE + PAGES_ON_ENDS) + 3 элементов,
+    пропуски - Paginator.ELLIPSIS.
+    """
+
+    @property
+    def elided_page_range(self):
+        return list(self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=PAGES_ON_EACH_SIDE,
+            on_ends=PAGES_ON_ENDS,
+        ))
+
+
+class KeysetPage(Page):
+    """Страница ленты, полученная по курсору.
+
+    Номер страницы известен только для первой страницы, поэтому
+    навигация строится на курсорах next_cursor и previous_cursor.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, number, paginator,
+                 has_next=False, has_previous=False):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0])
+        return None
+
+
+class CountedPaginator(Paginator):
+    """Paginator, которому можно передать заранее известное число объектов.
+
+    Если count передан (например, из денормализованного счётчика),
+    SELECT COUNT(*) не выполняется. Страницы - NumberedPage
+    с сокращённой навигацией (Paginator.get_elided_page_range).
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        if self._known_count is not None:
+            return self._known_count
+        return super().count
+
+    def _get_page(self, *args, **kwargs):
+        return NumberedPage(*args, **kwargs)
+
+
+class KeysetPaginator(CountedPaginator):
+    """Паджинатор ленты постов по ключу (pub_date, id).
+
+    Вместо OFFSET следующая страница выбирается условием
+    «строго после последнего показанного поста», поэтому глубина
+    листания не влияет на стоимость запроса, а COUNT(*) не нужен.
+    Постраничный режим (?page=N) унаследован от Paginator и
+    оставлен для старых ссылок.
+    """
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(object_list.order_by(*FEED_ORDERING), per_page,
+                         **kwargs)
+
+    def get_keyset_page(self, after=None, before=None):
+        """Возвращает страницу после курсора after или перед before.
+
+        Некорректный курсор, как и некорректный номер в get_page,
+        приводит к первой странице.
+        """
+        try:
+            if after:
+                return self._page_after(*decode_cursor(after))
+            if before:
+                return self._page_before(*decode_cursor(before))
+        except InvalidCursor:
+            pass
+        return self._first_page()
+
+    def _first_page(self):
+        rows = list(self.object_list[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page], 1, self,
+            has_next=len(rows) > self.per_page,
+        )
+
+    def _page_after(self, pub_date, pk):
+        rows = list(
+            self.object_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            )[:self.per_page + 1]
+        )
+        return KeysetPage(
+            rows[:self.per_page], None, self,
+            has_next=len(rows) > self.per_page,
+            has_previous=True,
+        )
+
+    def _page_before(self, pub_date, pk):
+        rows = list(
+            self.object_list.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+            ).reverse()[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        if not has_previous:
+            # Дошли до начала ленты - это обычная первая страница.
+            return self._first_page()
+        return KeysetPage(
+            rows, None, self, has_next=True, has_previous=True,
+        )
+
+
+class DeferredJoinPaginator(CountedPaginator):
+    """Паджинатор для списков по номеру страницы (?p=N в админке).
+
+    Сначала по индексу выбираются только id строк страницы, затем
+    сами строки - по этим id. Дальние страницы всё ещё пропускают
+    OFFSET строк, но пропуск идёт по узкому индексу, а не по таблице.
+    object_list страницы остаётся QuerySet, как ждёт formset админки.
+    """
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        ids = list(
+            self.object_list.values_list('pk', flat=True)[bottom:top]
+        )
+        return self._get_page(
+            self.object_list.filter(pk__in=ids), number, self
+        )
+
+
+def paginate(request, object_list, per_page, count=None,
+             paginator_class=KeysetPaginator, **kwargs):
+    """Возвращает страницу ленты для запроса.
+
+    ?after=/?before= - курсорный режим, ?page=N - старый постраничный.
+    Без параметров отдаётся первая страница курсорного режима.
+    count - известное заранее число постов в ленте.
+    """
+    paginator = paginator_class(object_list, per_page, count=count, **kwargs)
+    page_number = request.GET.get('page')
+    if page_number is not None:
+        return paginator.get_page(page_number)
+    return paginator.get_keyset_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
@@ -0,0 +1,173 @@
+"""Полнотекстовый поиск по тексту постов.
+
+Бэкенд выбирается настройкой POST_SEARCH_BACKEND. Каждый бэкенд умеет
+сузить QuerySet постов до найденных (filter) и упорядочить найденное
+по релевантности (search); индекс поддерживают сигналы Post.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'posts.search.SQLiteFTSBackend'
+WORD_RE = re.compile(r'\w+')
+
+
+def query_words(query):
+    """Слова поискового запроса без служебных символов."""
+    return WORD_RE.findall(query or '')
+
+
+class BaseSearchBackend:
+    """Интерфейс поискового бэкенда."""
+
+    def index_post(self, post):
+        """Добавляет или обновляет пост в индексе."""
+
+    def index_posts(self, queryset):
+        """Добавляет в индекс посты queryset, например после bulk_create."""
+        for post in queryset.only('id', 'text').iterator():
+            self.index_post(post)
+
+    def remove_post(self, post_id):
+        """Удаляет пост из индекса."""
+
+    def rebuild(self):
+        """Строит индекс заново по таблице постов."""
+
+    def filter(self, queryset, query):
+        """Оставляет в queryset только посты, подходящие под запрос."""
+        raise NotImplementedError
+
+    def search(self, queryset, query):
+        """Найденные посты, самые релевантные первыми."""
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """Инвертированный индекс на виртуальной таблице SQLite FTS5.
+
+    Таблица создаётся миграцией posts.0006_post_search_index,
+    rowid строки индекса совпадает с id поста.
+    """
+
+    TABLE = 'posts_post_fts'
+
+    def match_expression(self, query):
+        # Каждое слово - фраза с поиском по префиксу: "котик"* найдёт
+        # и «котики». Кавычки исключают операторы FTS5 из ввода
+        return ' '.join(f'"{word}"*' for word in query_words(query))
+
+    def index_post(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {self.TABLE} (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text],
+            )
+
+    def index_posts(self, queryset):
+        # Одним INSERT ... SELECT вместо запроса на каждый пост
+        sql, params = queryset.values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.TABLE} WHERE rowid IN ({sql})', params
+            )
+            cursor.execute(
+                f'INSERT INTO {self.TABLE} (rowid, text) '
+                f'SELECT id, text FROM posts_post WHERE id IN ({sql})',
+                params,
+            )
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE}')
+            cursor.execute(
+                f'INSERT INTO {self.TABLE} (rowid, text) '
+                f'SELECT id, text FROM posts_post'
+            )
+
+    def _join(self, queryset, query, **extra):
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=[self.TABLE],
+            where=[
+                f'{self.TABLE}.rowid = {table}.id',
+                f'{self.TABLE} MATCH %s',
+            ],
+            params=[self.match_expression(query)],
+            **extra,
+        )
+
+    def filter(self, queryset, query):
+        if not query_words(query):
+            return queryset.none()
+        return self._join(queryset, query)
+
+    def search(self, queryset, query):
+        if not query_words(query):
+            return queryset.none()
+        # bm25 тем меньше, чем релевантнее пост
+        return self._join(
+            queryset, query,
+            select={'search_rank': f'bm25({self.TABLE})'},
+        ).order_by('search_rank', '-pub_date')
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Поиск по tsvector средствами django.contrib.postgres.
+
+    Вектор строится на лету; для больших таблиц к нему нужен
+    GIN-индекс по to_tsvector(POST_SEARCH_CONFIG, text).
+    """
+
+    def _vector_and_query(self, query):
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+
+        config = getattr(settings, 'POST_SEARCH_CONFIG', 'russian')
+        return (
+            SearchVector('text', config=config),
+            SearchQuery(' '.join(query_words(query)), config=config),
+        )
+
+    def filter(self, queryset, query):
+        vector, search_query = self._vector_and_query(query)
+        return queryset.annotate(search=vector).filter(search=search_query)
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchRank
+
+        vector, search_query = self._vector_and_query(query)
+        return queryset.annotate(
+            search=vector, search_rank=SearchRank(vector, search_query),
+        ).filter(search=search_query).order_by('-search_rank', '-pub_date')
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Запасной бэкенд без индекса: все слова через icontains."""
+
+    def filter(self, queryset, query):
+        words = query_words(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(text__icontains=word)
+        return queryset
+
+    def search(self, queryset, query):
+        return self.filter(queryset, query).order_by('-pub_date', '-id')
+
+
+def get_backend():
+    return import_string(
+        getattr(settings, 'POST_SEARCH_BACKEND', DEFAULT_BACKEND)
+    )()
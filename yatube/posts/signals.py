@@ -0,0 +1,242 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core import jobs
+
+from . import autocomplete, page_cache, timeline
+from .cache_keys import GROUP_CHOICES_KEY
+from .counters import (change_author_count, change_group_count,
+                       distrust_counters)
+from .models import Group, Post
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_group(sender, instance, raw, **kwargs):
+    """Запоминает группу (id, slug) и автора (id, username) поста
+    до редактирования: в админке пост можно перенести к другому автору.
+    """
+    instance._previous_group = instance._previous_author = None
+    if raw or instance.pk is None:
+        return
+    previous = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list('group_id', 'group__slug',
+                     'author_id', 'author__username').first()
+    )
+    if previous is not None:
+        instance._previous_group = previous[:2]
+        instance._previous_author = previous[2:]
+
+
+def _previous_group(instance):
+    return getattr(instance, '_previous_group', None) or (None, None)
+
+
+def _previous_author(instance):
+    """(id, username) прежнего автора, если пост перенесли к другому."""
+    previous = getattr(instance, '_previous_author', None)
+    if previous is None or previous[0] == instance.author_id:
+        return None, None
+    return previous
+
+
+@receiver(post_save, sender=Post)
+def update_counters_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        # loaddata: счётчики не меняем, но и не доверяем им
+        distrust_counters()
+        return
+    if created:
+        change_author_count(instance.author_id, 1)
+        change_group_count(instance.group_id, 1)
+        return
+    previous_group_id, _ = _previous_group(instance)
+    if previous_group_id != instance.group_id:
+        change_group_count(previous_group_id, -1)
+        change_group_count(instance.group_id, 1)
+    previous_author_id, _ = _previous_author(instance)
+    if previous_author_id is not None:
+        change_author_count(previous_author_id, -1)
+        change_author_count(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def update_counters_on_delete(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    """Сбрасывает кеш главной, группы и автора изменённого поста."""
+    tags = [
+        page_cache.INDEX_TAG,
+        page_cache.AUTHOR_TAG.format(username=instance.author.username),
+    ]
+    if instance.group_id is not None:
+        tags.append(page_cache.GROUP_TAG.format(slug=instance.group.slug))
+    _, previous_slug = _previous_group(instance)
+    if previous_slug is not None:
+        tags.append(page_cache.GROUP_TAG.format(slug=previous_slug))
+    _, previous_username = _previous_author(instance)
+    if previous_username is not None:
+        tags.append(page_cache.AUTHOR_TAG.format(username=previous_username))
+    page_cache.invalidate(*tags)
+
+
+@receiver(post_save, sender=Post)
+def add_to_timeline(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        for feed in timeline.for_post(instance):
+            feed.add(instance)
+        return
+    # Правка не меняет pub_date, а значит и место поста в ленте;
+    # меняться могут группа и (в админке) автор
+    previous_group_id, _ = _previous_group(instance)
+    if previous_group_id != instance.group_id:
+        if previous_group_id is not None:
+            timeline.for_group(previous_group_id).remove(instance.pk)
+        if instance.group_id is not None:
+            timeline.for_group(instance.group_id).add(instance)
+    previous_author_id, _ = _previous_author(instance)
+    if previous_author_id is not None:
+        timeline.for_author(previous_author_id).remove(instance.pk)
+        timeline.for_author(instance.author_id).add(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_timeline(sender, instance, **kwargs):
+    for feed in timeline.for_post(instance):
+        feed.remove(instance.pk)
+
+
+# Поисковый индекс обновляется в фоне, после ответа на запрос;
+# счётчики, ленты и кеш страниц - сразу, чтобы автор увидел свой пост
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, raw, **kwargs):
+    if not raw:
+        jobs.enqueue('posts.index_post', post_id=instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_text(sender, instance, **kwargs):
+    jobs.enqueue('posts.remove_post', post_id=instance.pk)
+
+
+@receiver(pre_save, sender=Group)
+def remember_previous_slug(sender, instance, raw, **kwargs):
+    instance._previous_slug = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_slug = (
+        Group.objects.filter(pk=instance.pk)
+        .values_list('slug', flat=True).first()
+    )
+
+
+def _group_authors(group):
+    return set(
+        User.objects.filter(posts__group=group)
+        .values_list('username', flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Group)
+def remember_group_authors(sender, instance, **kwargs):
+    # После удаления у постов группы уже group=NULL
+    instance._previous_authors = _group_authors(instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_pages(sender, instance, **kwargs):
+    """Группа выводится на главной, своей странице и страницах авторов."""
+    cache.delete(GROUP_CHOICES_KEY)
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)}
+    authors = getattr(instance, '_previous_authors', None)
+    if authors is None:
+        authors = _group_authors(instance)
+    page_cache.invalidate(
+        page_cache.INDEX_TAG,
+        *(page_cache.GROUP_TAG.format(slug=slug) for slug in slugs if slug),
+        *(page_cache.AUTHOR_TAG.format(username=name) for name in authors),
+    )
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_timeline(sender, instance, **kwargs):
+    # Посты группы получили group=NULL одним UPDATE, без сигналов
+    timeline.for_group(instance.pk).invalidate()
+
+
+@receiver(post_save, sender=Group)
+def update_group_autocomplete(sender, instance, **kwargs):
+    autocomplete.index.update(autocomplete.group_entry(instance))
+
+
+@receiver(post_delete, sender=Group)
+def remove_group_autocomplete(sender, instance, **kwargs):
+    autocomplete.index.remove(autocomplete.GROUP, instance.pk)
+
+
+# Поля пользователя, которые выводятся на страницах лент
+USER_PAGE_FIELDS = frozenset(('username', 'first_name', 'last_name'))
+
+
+def _changes_pages(update_fields):
+    # Вход пользователя сохраняет только last_login
+    return not update_fields or bool(USER_PAGE_FIELDS & set(update_fields))
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_username(sender, instance, raw, update_fields,
+                               **kwargs):
+    instance._previous_username = None
+    if raw or instance.pk is None or not _changes_pages(update_fields):
+        return
+    instance._previous_username = (
+        User.objects.filter(pk=instance.pk)
+        .values_list('username', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, instance, created, raw, update_fields,
+                          **kwargs):
+    """Имя автора выводится в карточках его постов во всех лентах."""
+    if created or raw or not _changes_pages(update_fields):
+        return
+    usernames = {
+        instance.username, getattr(instance, '_previous_username', None)
+    }
+    slugs = (
+        Group.objects.filter(posts__author=instance)
+        .values_list('slug', flat=True).distinct()
+    )
+    page_cache.invalidate(
+        page_cache.INDEX_TAG,
+        *(page_cache.AUTHOR_TAG.format(username=name)
+          for name in usernames if name),
+        *(page_cache.GROUP_TAG.format(slug=slug) for slug in slugs),
+    )
+
+
+@receiver(post_save, sender=User)
+def update_user_autocomplete(sender, instance, **kwargs):
+    if autocomplete.is_listed(instance):
+        autocomplete.index.update(autocomplete.user_entry(instance))
+    else:
+        autocomplete.index.remove(autocomplete.USER, instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def remove_user_autocomplete(sender, instance, **kwargs):
+    autocomplete.index.remove(autocomplete.USER, instance.pk)
@@ -0,0 +1,63 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CARD_TEMPLATE = 'posts/includes/post.html'
+CARD_KEY = 'post_card:{pk}:{version}:{related}:{show_group}'
+DEFAULT_TIMEOUT = 60 * 60 * 24
+
+
+def related_version(post):
+    """Версия автора и группы: отпечаток полей, которые выводит карточка.
+
+    Они выбираются вместе с постом (for_feed), так что переименование
+    группы или автора меняет ключ без сигналов и в любом процессе.
+    """
+    fields = [post.author.get_full_name()]
+    if post.group_id is not None:
+        fields += [post.group.slug, post.group.title]
+    return hashlib.md5('\n'.join(fields).encode()).hexdigest()[:12]
+
+
+def card_key(post, show_group):
+    # edit_date обновляется при каждом сохранении поста,
+    # поэтому отредактированный пост получает новый ключ
+    version = int(post.edit_date.timestamp() * 1_000_000)
+    return CARD_KEY.format(
+        pk=post.pk, version=version, related=related_version(post),
+        show_group=int(show_group),
+    )
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Возвращает отрисованные карточки постов страницы.
+
+    Готовые карточки достаются из кеша одним get_many,
+    недостающие рендерятся и сохраняются одним set_many.
+    """
+    group = context.get('group')
+    keys = [
+        card_key(post, not group and post.group_id is not None)
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+
+    missing = {}
+    card_template = get_template(CARD_TEMPLATE)
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missing[key] = card_template.render({'post': post, 'group': group})
+    if missing:
+        cache.set_many(
+            missing,
+            getattr(settings, 'POST_CARD_TIMEOUT', DEFAULT_TIMEOUT),
+        )
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,27 @@
+"""Общие данные для тестов: автор, группа и посты.
+
+Вызываются из setUpTestData: объекты создаются один раз на класс.
+"""
+from django.contrib.auth import get_user_model
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+def create_author(username='auth', **fields):
+    return User.objects.create_user(username=username, **fields)
+
+
+def create_group(slug='cats', title='Кошечки'):
+    return Group.objects.create(
+        title=title, slug=slug, description='Тестовое описание'
+    )
+
+
+def create_posts(author, count, group=None, text='Пост {}'):
+    """count постов автора по порядку публикации, от старых к новым."""
+    return [
+        Post.objects.create(author=author, group=group, text=text.format(i))
+        for i in range(count)
+    ]
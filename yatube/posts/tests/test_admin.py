@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..counters import rebuild_counters
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+# Поисковый индекс обновляется задачами core.jobs
+@override_settings(JOBS_EAGER=True)
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(3)
+        ]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'group-{i}',
+                description='Тестовое описание',
+            )
+            for i in range(5)
+        ]
+        cls.url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def create_posts(self, count):
+        for i in range(count):
+            Post.objects.create(
+                author=self.authors[i % len(self.authors)],
+                text=f'Пост {i}',
+                group=self.groups[i % len(self.groups)],
+            )
+
+    def changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return queries, response
+
+    def test_query_count_does_not_depend_on_rows(self):
+        self.create_posts(2)
+        few, _ = self.changelist_queries()
+        self.create_posts(30)
+        many, response = self.changelist_queries()
+        # Второй раз список групп уже берётся из кеша,
+        # а сумма счётчиков уже сверена с COUNT(*)
+        self.assertEqual(len(few) - 2, len(many))
+        self.assertEqual(response.context['cl'].result_count, 32)
+        self.assertEqual(len(response.context['cl'].result_list), 32)
+
+    def counts_posts(self, queries):
+        return any(
+            'COUNT(' in query['sql'] and 'FROM "posts_post"' in query['sql']
+            for query in queries.captured_queries
+        )
+
+    def test_unfiltered_count_from_counters(self):
+        self.create_posts(3)
+        # Первый раз сумма счётчиков сверяется с COUNT(*)
+        queries, response = self.changelist_queries()
+        self.assertTrue(self.counts_posts(queries))
+        queries, response = self.changelist_queries()
+        self.assertEqual(response.context['cl'].result_count, 3)
+        self.assertFalse(self.counts_posts(queries))
+
+    def test_count_after_writes_bypassing_signals(self):
+        self.create_posts(3)
+        self.changelist_queries()
+        # Как loaddata: сигнал с raw=True
+        Post.objects.bulk_create([Post(author=self.authors[0], text='Мимо')])
+        post = Post.objects.latest('pk')
+        post.save_base(raw=True)
+        queries, response = self.changelist_queries()
+        self.assertEqual(response.context['cl'].result_count, 4)
+        self.assertTrue(self.counts_posts(queries))
+        rebuild_counters()
+        queries, response = self.changelist_queries()
+        self.assertEqual(response.context['cl'].result_count, 4)
+        self.assertFalse(self.counts_posts(queries))
+
+    def test_search_counts_matching_rows(self):
+        self.create_posts(3)
+        _, response = self.changelist_queries({'q': 'Пост 1'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_deep_page(self):
+        Post.objects.bulk_create(
+            Post(author=self.authors[0], text=f'Пост {i}')
+            for i in range(250)
+        )
+        rebuild_counters()
+        # Страницы списка в админке нумеруются с 1 (Django 3.2+)
+        _, response = self.changelist_queries({'p': 3})
+        cl = response.context['cl']
+        self.assertEqual(len(cl.result_list), 50)
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)[200:250]
+        )
+        self.assertEqual([post.pk for post in cl.result_list], expected)
+
+    def test_group_choices_shared_and_invalidated(self):
+        self.create_posts(5)
+        _, response = self.changelist_queries()
+        self.assertContains(response, 'Группа 4')
+        Group.objects.create(
+            title='Новая группа', slug='new', description='Описание'
+        )
+        _, response = self.changelist_queries()
+        self.assertContains(response, 'Новая группа')
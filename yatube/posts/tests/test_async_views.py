@@ -0,0 +1,122 @@
+import asyncio
+from importlib import reload
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+
+import about.urls
+import yatube.urls
+from core.server import ASGIHandler
+
+from .. import async_views
+from .. import urls as posts_urls
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+def reload_urls():
+    reload(posts_urls)
+    reload(about.urls)
+    reload(yatube.urls)
+    clear_url_caches()
+
+
+async def asgi_get(application, path, query_string=b'', headers=()):
+    """Сообщения, которые ASGI-приложение отправило в ответ на GET."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application({
+        'type': 'http', 'method': 'GET', 'path': path,
+        'query_string': query_string, 'headers': list(headers),
+    }, receive, send)
+    return messages
+
+
+# Потоки пула открывают свои соединения с базой,
+# поэтому данные должны быть закоммичены
+@override_settings(PAGE_CACHE_TIMEOUT=0, ASYNC_VIEWS=True)
+class AsyncViewsTest(TransactionTestCase):
+    def setUp(self):
+        reload_urls()
+        self.addCleanup(reload_urls)
+        self.author = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(
+            title='Кошечки', slug='cats', description='Тестовое описание'
+        )
+        self.post = Post.objects.create(
+            author=self.author, text='Тестовый пост', group=self.group
+        )
+
+    def test_read_views_are_async(self):
+        urls = {
+            reverse('posts:index'): async_views.index,
+            reverse('posts:group_list', args=('cats',)):
+                async_views.group_posts,
+            reverse('posts:profile', args=('auth',)): async_views.profile,
+            reverse('posts:post_detail', args=(self.post.pk,)):
+                async_views.post_detail,
+        }
+        for url, view in urls.items():
+            with self.subTest(url=url):
+                self.assertIs(resolve(url).func, view)
+                self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertTrue(asyncio.iscoroutinefunction(
+            resolve(reverse('about:author')).func
+        ))
+
+    async def test_pages_through_asgi(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=('cats',)),
+            reverse('posts:profile', args=('auth',)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            reverse('about:author'),
+            reverse('about:tech'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+        with self.settings(DEBUG=True):
+            response = await self.async_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Тестовый пост')
+        # Запросы view из пула потоков попадают в замер middleware
+        self.assertNotIn('0 queries', response['Server-Timing'])
+
+    async def test_concurrent_requests(self):
+        responses = await asyncio.gather(*(
+            self.async_client.get(reverse('posts:profile', args=('auth',)))
+            for _ in range(10)
+        ))
+        self.assertEqual(
+            [response.status_code for response in responses], [200] * 10
+        )
+
+    def test_export_through_asgi(self):
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        cookie = self.client.cookies[settings.SESSION_COOKIE_NAME]
+        messages = async_to_sync(asgi_get)(
+            ASGIHandler(), reverse('posts:export'),
+            query_string=b'format=csv',
+            headers=[
+                (b'host', b'testserver'),
+                (b'cookie', f'{cookie.key}={cookie.value}'.encode()),
+            ],
+        )
+        self.assertEqual(messages[0]['status'], 200)
+        body = b''.join(message.get('body', b'') for message in messages)
+        self.assertEqual(
+            body.decode().splitlines()[1].split(',')[:3],
+            [str(self.post.pk), 'Тестовый пост', 'auth'],
+        )
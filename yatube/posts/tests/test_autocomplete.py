@@ -0,0 +1,107 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import autocomplete
+from ..forms import PostForm
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class AutocompleteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Ёжики в тумане',
+            slug='hedgehogs',
+            description='Тестовое описание',
+        )
+        cls.author = User.objects.create_user(
+            username='irina', first_name='Ирина', last_name='Димаева'
+        )
+
+    def setUp(self):
+        autocomplete.index.build()
+
+    def lookup(self, query, **params):
+        response = self.client.get(
+            reverse('posts:autocomplete'), {'q': query, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [
+            (result['kind'], result['label'])
+            for result in response.json()['results']
+        ]
+
+    def test_prefix_lookup(self):
+        self.assertEqual(self.lookup('ежик'), [('group', 'Ёжики в тумане')])
+        self.assertEqual(self.lookup('HEDGE'), [('group', 'Ёжики в тумане')])
+        self.assertEqual(self.lookup('ири'), [('user', 'Ирина Димаева')])
+        self.assertEqual(self.lookup('iri'), [('user', 'Ирина Димаева')])
+        self.assertEqual(self.lookup('iri', kind='group'), [])
+        self.assertEqual(self.lookup(''), [])
+
+    def test_lookup_without_queries(self):
+        url = reverse('posts:autocomplete')
+        with self.assertNumQueries(0):
+            self.client.get(url, {'q': 'еж'})
+
+    def test_signals_update_index(self):
+        group = Group.objects.create(
+            title='Ежевика', slug='blackberry', description='Описание'
+        )
+        self.assertEqual(len(self.lookup('еж')), 2)
+        group.title = 'Малина'
+        group.save()
+        self.assertEqual(self.lookup('малин'), [('group', 'Малина')])
+        self.assertEqual(len(self.lookup('еж')), 1)
+        group.delete()
+        self.assertEqual(self.lookup('малин'), [])
+
+    def test_staff_and_inactive_users_hidden(self):
+        User.objects.create_user(username='iris_admin', is_staff=True)
+        User.objects.create_superuser(username='iris_root', password='x')
+        user = User.objects.create_user(username='iris', is_active=False)
+        autocomplete.index.build()
+        self.assertEqual(self.lookup('iri'), [('user', 'Ирина Димаева')])
+        user.is_active = True
+        user.save()
+        self.assertEqual(len(self.lookup('iri')), 2)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.lookup('iri'), [('user', 'Ирина Димаева')])
+
+    @override_settings(AUTOCOMPLETE_REBUILD_SECONDS=0)
+    def test_single_rebuild_in_background(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build():
+            started.set()
+            release.wait(5)
+
+        with mock.patch.object(
+            autocomplete.index, 'build', side_effect=slow_build
+        ) as build:
+            # Запросы не ждут перестройку и ищут по старому индексу
+            with self.assertNumQueries(0):
+                for _ in range(5):
+                    self.assertEqual(len(self.lookup('ири')), 1)
+            self.assertTrue(started.wait(5))
+            release.set()
+        self.assertEqual(build.call_count, 1)
+
+    def test_group_widget(self):
+        post = Post.objects.create(
+            author=self.author, text='Тестовый пост', group=self.group
+        )
+        form = PostForm(instance=post)
+        with self.assertNumQueries(0):
+            html = str(form['group'])
+        self.assertIn(f'value="{self.group.pk}"', html)
+        self.assertIn('value="Ёжики в тумане"', html)
+        self.assertNotIn('<select', html)
@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0, PAGE_CACHE_SHARED=True)
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Кошечки',
+            slug='cats',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group
+        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', args=('cats',)),
+            'profile': reverse('posts:profile', args=('auth',)),
+            'detail': reverse('posts:post_detail', args=(cls.post.pk,)),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url, response, client=None):
+        return (client or self.client).get(
+            url,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+    def test_not_modified_without_render(self):
+        """Повторный запрос с валидаторами - 304 без рендера шаблона."""
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Last-Modified', response)
+
+                expected_queries = 1 if name == 'detail' else 0
+                with self.assertNumQueries(expected_queries):
+                    repeated = self.revalidate(url, response)
+                self.assertEqual(repeated.status_code, 304)
+                self.assertEqual(repeated.templates, [])
+                self.assertEqual(repeated.content, b'')
+
+    def test_changes_invalidate_validators(self):
+        responses = {name: self.client.get(url)
+                     for name, url in self.urls.items()}
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.revalidate(url, responses[name])
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Новый текст')
+
+    def test_deleted_post_changes_feeds(self):
+        other = Post.objects.create(author=self.author, text='Удаляемый')
+        response = self.client.get(self.urls['index'])
+        other.delete()
+        self.assertEqual(
+            self.revalidate(self.urls['index'], response).status_code, 200
+        )
+
+    def test_etag_depends_on_user(self):
+        """Шапка у вошедшего пользователя другая - и ETag тоже."""
+        guest_response = self.client.get(self.urls['index'])
+        author_client = self.client_class()
+        author_client.force_login(self.author)
+        response = self.revalidate(
+            self.urls['index'], guest_response, client=author_client
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], guest_response['ETag'])
+
+    def test_renamed_author_and_group_change_validators(self):
+        responses = {name: self.client.get(url)
+                     for name, url in self.urls.items()}
+        # Без сигналов: имя автора входит в ETag страницы поста
+        User.objects.filter(pk=self.author.pk).update(first_name='Ирина')
+        response = self.revalidate(self.urls['detail'], responses['detail'])
+        self.assertContains(response, 'Ирина')
+
+        responses = {name: self.client.get(url)
+                     for name, url in self.urls.items()}
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Котята'
+        group.save()
+        for name in ('index', 'group', 'profile', 'detail'):
+            with self.subTest(page=name):
+                response = self.revalidate(self.urls[name], responses[name])
+                self.assertContains(response, 'Котята')
+
+    def test_deleted_group_changes_validators(self):
+        """Посты удалённой группы остаются у автора, но без ссылки на неё."""
+        responses = {name: self.client.get(url)
+                     for name, url in self.urls.items()}
+        Group.objects.get(pk=self.group.pk).delete()
+        for name in ('index', 'profile', 'detail'):
+            with self.subTest(page=name):
+                response = self.revalidate(self.urls[name], responses[name])
+                self.assertEqual(response.status_code, 200)
+                self.assertNotContains(response, self.urls['group'])
+
+    @override_settings(PAGE_CACHE_SHARED=None)
+    def test_no_304_with_per_process_tags(self):
+        """Версии тегов в LocMemCache не видны другим процессам."""
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.client.get(url)
+                self.assertNotIn('ETag', response)
+                response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,77 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import AuthorStats, Group, Post
+from .fixtures import create_author, create_group
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        cls.group_cat = create_group()
+        cls.group_dog = create_group('dogs', 'Собачки')
+
+    def assertCounters(self, author_count, cat_count, dog_count):
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).post_count,
+            author_count
+        )
+        self.assertEqual(
+            Group.objects.get(pk=self.group_cat.pk).post_count, cat_count
+        )
+        self.assertEqual(
+            Group.objects.get(pk=self.group_dog.pk).post_count, dog_count
+        )
+
+    def test_counters_follow_posts(self):
+        """Счётчики меняются при создании, переносе и удалении поста."""
+        post = Post.objects.create(
+            author=self.author, text='Тестовый пост', group=self.group_cat
+        )
+        Post.objects.create(author=self.author, text='Без группы')
+        self.assertCounters(2, 1, 0)
+
+        post.group = self.group_dog
+        post.save()
+        self.assertCounters(2, 0, 1)
+
+        post.delete()
+        self.assertCounters(1, 0, 0)
+
+    def test_rebuild_command(self):
+        """Команда восстанавливает счётчики после массовой вставки."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост {i}', group=self.group_cat)
+            for i in range(3)
+        )
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertCounters(3, 3, 0)
+
+    def test_delete_uncounted_post(self):
+        """Удаление поста, не попавшего в счётчики, их не ломает."""
+        Post.objects.create(author=self.author, text='Тестовый пост')
+        Post.objects.bulk_create([
+            Post(author=self.author, text='Мимо', group=self.group_cat)
+        ])
+        for post in Post.objects.all():
+            post.delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_profile_post_count(self):
+        Post.objects.create(author=self.author, text='Тестовый пост')
+        response = self.client.get(f'/profile/{self.author.username}/')
+        self.assertEqual(response.context['post_count'], 1)
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+
+    def test_post_moved_to_other_author(self):
+        """Перенос поста к другому автору (админка) меняет оба счётчика."""
+        other = create_author('other')
+        post = Post.objects.create(author=self.author, text='Тестовый пост')
+        Post.objects.create(author=other, text='Свой пост')
+        post.author = other
+        post.save()
+        self.assertCounters(0, 0, 0)
+        self.assertEqual(AuthorStats.objects.get(author=other).post_count, 2)
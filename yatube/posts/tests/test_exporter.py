@@ -0,0 +1,99 @@
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Кошечки',
+            slug='cats',
+            description='Тестовое описание',
+        )
+        cls.old = Post.objects.create(
+            author=cls.author, text='Старый пост', group=cls.group
+        )
+        cls.new = Post.objects.create(author=cls.author, text='Новый пост')
+        cls.foreign = Post.objects.create(
+            author=cls.other, text='Чужой пост', group=cls.group
+        )
+        for post, year, month in ((cls.old, 2020, 1), (cls.new, 2021, 1),
+                                  (cls.foreign, 2021, 6)):
+            post.pub_date = timezone.make_aware(datetime(year, month, 1))
+            Post.objects.filter(pk=post.pk).update(pub_date=post.pub_date)
+
+    def setUp(self):
+        self.staff_client = self.client_class()
+        self.staff_client.force_login(self.staff)
+
+    def export(self, **params):
+        response = self.staff_client.get(reverse('posts:export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_jsonl(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual(rows[0], {
+            'id': self.old.id,
+            'text': 'Старый пост',
+            'author': 'auth',
+            'group': 'cats',
+            'pub_date': self.old.pub_date.isoformat(),
+        })
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [self.old.id, self.new.id, self.foreign.id],
+        )
+
+    def test_export_filters(self):
+        def ids(**params):
+            return [row['id'] for row in csv.DictReader(
+                StringIO(self.export(format='csv', **params))
+            )]
+
+        self.assertEqual(
+            ids(group='cats'), [str(self.old.id), str(self.foreign.id)]
+        )
+        self.assertEqual(
+            ids(author='auth'), [str(self.old.id), str(self.new.id)]
+        )
+        self.assertEqual(
+            ids(since='2020-06-01', until='2021-03-01T00:00:00'),
+            [str(self.new.id)],
+        )
+
+    def test_export_requires_staff(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_bad_parameters(self):
+        for params in ({'format': 'xml'}, {'since': 'вчера'}):
+            with self.subTest(params=params):
+                response = self.staff_client.get(
+                    reverse('posts:export'), params
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_export_command(self):
+        stdout = StringIO()
+        call_command('export_posts', author='other', stdout=stdout)
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([row['text'] for row in rows], ['Чужой пост'])
@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..importer import PostImporter, import_posts, read_rows
+from ..models import AuthorStats, Group, Post
+from ..search import get_backend
+
+User = get_user_model()
+
+
+class PostImportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Кошечки',
+            slug='cats',
+            description='Тестовое описание',
+        )
+
+    def test_import_valid_rows(self):
+        """Посты создаются с автором, группой, датой и счётчиками."""
+        result = import_posts([
+            {'text': 'Котики гуляют', 'author': 'auth', 'group': 'cats',
+             'pub_date': '2021-01-02T03:04:05'},
+            {'text': 'Без группы', 'author': 'auth', 'group': ''},
+            {'text': 'Третий пост', 'author': 'auth'},
+        ], batch_size=2)
+        self.assertEqual(result.created, 3)
+        self.assertEqual(result.errors, [])
+
+        post = Post.objects.get(text='Котики гуляют')
+        self.assertEqual(post.author, self.author)
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(post.pub_date.year, 2021)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).post_count, 3
+        )
+        self.assertEqual(Group.objects.get(pk=self.group.pk).post_count, 1)
+        found = get_backend().search(Post.objects.all(), 'котики')
+        self.assertEqual(list(found), [post])
+
+    def test_only_inserted_posts_are_processed(self):
+        """Чужие вставки не считаются импортированными."""
+        Post.objects.bulk_create([Post(author=self.author, text='Ранний')])
+        insert = PostImporter._insert
+
+        def insert_after_other(importer, posts):
+            # Кто-то вставил пост в обход сигналов прямо перед нами
+            Post.objects.bulk_create([
+                Post(author=self.author, text='Чужой', group=self.group)
+            ])
+            return insert(importer, posts)
+
+        with mock.patch.object(PostImporter, '_insert', insert_after_other):
+            result = import_posts([
+                {'text': 'Котики', 'author': 'auth', 'group': 'cats'},
+            ])
+        self.assertEqual(result.created, 1)
+        found = get_backend().search(Post.objects.all(), 'чужой')
+        self.assertFalse(found.exists())
+        # Счётчики пересчитаны по таблице, с учётом всех постов
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).post_count, 3
+        )
+        self.assertEqual(Group.objects.get(pk=self.group.pk).post_count, 2)
+
+    def test_invalid_rows_are_reported(self):
+        """Неверные строки пропускаются, остальные импортируются."""
+        result = import_posts([
+            {'text': '   ', 'author': 'auth'},
+            {'text': 'Пост', 'author': 'nobody'},
+            {'text': 'Пост', 'author': 'auth', 'group': 'dogs'},
+            {'text': 'Пост', 'author': 'auth', 'pub_date': 'вчера'},
+            {'text': 'Пост', 'author': ['auth']},
+            {'text': 'Пост', 'author': 'auth'},
+        ])
+        self.assertEqual(result.created, 1)
+        self.assertEqual(
+            [(number, list(errors)) for number, errors in result.errors],
+            [(1, ['text']), (2, ['author']), (3, ['group']),
+             (4, ['pub_date']), (5, ['author'])],
+        )
+
+    def test_read_rows(self):
+        jsonl = StringIO('{"text": "Пост"}\n\nне json\n[1]\n')
+        self.assertEqual(
+            [sorted(row) for row in read_rows(jsonl)],
+            [['text'], ['__error__'], ['__error__']],
+        )
+        csv = StringIO('text,author,group\nПост,auth,cats\n')
+        self.assertEqual(
+            list(read_rows(csv, 'csv')),
+            [{'text': 'Пост', 'author': 'auth', 'group': 'cats'}],
+        )
+
+    def test_import_command(self):
+        rows = [{'text': f'Пост {i}', 'author': 'auth', 'group': 'cats'}
+                for i in range(3)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.jsonl')
+            with open(path, 'w', encoding='utf-8') as posts_file:
+                posts_file.write('\n'.join(json.dumps(row) for row in rows))
+                posts_file.write('\n{"text": "Пост"}\n')
+            stdout, stderr = StringIO(), StringIO()
+            call_command('import_posts', path, stdout=stdout, stderr=stderr)
+        self.assertIn('Импортировано постов: 3', stdout.getvalue())
+        self.assertIn('Строка 4, author', stderr.getvalue())
+        self.assertEqual(self.group.posts.count(), 3)
+
+    def test_import_command_warns_about_local_cache(self):
+        for shared, warned in ((None, True), (True, False)):
+            with self.subTest(shared=shared), \
+                    self.settings(PAGE_CACHE_SHARED=shared):
+                stderr = StringIO()
+                call_command('import_posts', os.devnull, stdout=StringIO(),
+                             stderr=stderr)
+                self.assertIs('LocMemCache' in stderr.getvalue(), warned)
@@ -0,0 +1,242 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.db import read_from_replica
+
+from .. import page_cache
+from ..models import Group, Post
+from ..templatetags.post_cards import card_key
+
+User = get_user_model()
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.other_author = User.objects.create_user(username='other')
+        cls.group_cat = Group.objects.create(
+            title='Кошечки',
+            slug='cats',
+            description='Тестовое описание',
+        )
+        cls.group_dog = Group.objects.create(
+            title='Собачки',
+            slug='dogs',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group_cat
+        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'cats': reverse('posts:group_list', args=(cls.group_cat.slug,)),
+            'dogs': reverse('posts:group_list', args=(cls.group_dog.slug,)),
+            'author': reverse('posts:profile', args=(cls.author.username,)),
+            'other': reverse(
+                'posts:profile', args=(cls.other_author.username,)
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        page_cache.reset_stats()
+        self.guest_client = Client()
+
+    def cache_state(self):
+        return {
+            name: self.guest_client.get(url)['X-Page-Cache']
+            for name, url in self.urls.items()
+        }
+
+    def test_second_request_is_hit(self):
+        self.assertEqual(set(self.cache_state().values()), {'miss'})
+        self.assertEqual(set(self.cache_state().values()), {'hit'})
+        self.assertEqual(
+            page_cache.stats()['index'], {'hit': 1, 'miss': 1}
+        )
+
+    def test_cursor_pages_cached_separately(self):
+        url = self.urls['index']
+        self.guest_client.get(url)
+        response = self.guest_client.get(url, {'page': 2})
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    def test_post_save_purges_only_affected_pages(self):
+        """Новый пост сбрасывает главную, свою группу и своего автора."""
+        self.cache_state()
+        Post.objects.create(
+            author=self.author, text='Новый пост', group=self.group_cat
+        )
+        self.assertEqual(self.cache_state(), {
+            'index': 'miss',
+            'cats': 'miss',
+            'dogs': 'hit',
+            'author': 'miss',
+            'other': 'hit',
+        })
+
+    def test_group_change_purges_previous_group(self):
+        self.cache_state()
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.group_dog
+        post.save()
+        state = self.cache_state()
+        self.assertEqual(state['cats'], 'miss')
+        self.assertEqual(state['dogs'], 'miss')
+        self.assertEqual(state['other'], 'hit')
+
+    def test_author_change_purges_previous_author(self):
+        self.cache_state()
+        post = Post.objects.get(pk=self.post.pk)
+        post.author = self.other_author
+        post.save()
+        state = self.cache_state()
+        self.assertEqual(state['author'], 'miss')
+        self.assertEqual(state['other'], 'miss')
+        self.assertEqual(state['dogs'], 'hit')
+
+    def test_group_rename_purges_old_slug_and_authors(self):
+        self.cache_state()
+        group = Group.objects.get(pk=self.group_cat.pk)
+        group.slug = 'kittens'
+        group.save()
+        # Под старым slug страница больше не отдаётся из кеша
+        response = self.guest_client.get(self.urls['cats'])
+        self.assertEqual(response.status_code, 404)
+        for name, state in (('index', 'miss'), ('author', 'miss'),
+                            ('other', 'hit')):
+            with self.subTest(page=name):
+                response = self.guest_client.get(self.urls[name])
+                self.assertEqual(response['X-Page-Cache'], state)
+
+    def test_group_delete_purges_authors(self):
+        self.cache_state()
+        Group.objects.get(pk=self.group_cat.pk).delete()
+        response = self.guest_client.get(self.urls['cats'])
+        self.assertEqual(response.status_code, 404)
+        for name, state in (('index', 'miss'), ('author', 'miss'),
+                            ('dogs', 'hit'), ('other', 'hit')):
+            with self.subTest(page=name):
+                response = self.guest_client.get(self.urls[name])
+                self.assertEqual(response['X-Page-Cache'], state)
+                self.assertNotContains(response, self.urls['cats'])
+
+    def test_author_rename_purges_feeds(self):
+        self.cache_state()
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name = 'Ирина'
+        author.save()
+        state = self.cache_state()
+        self.assertEqual(state['index'], 'miss')
+        self.assertEqual(state['cats'], 'miss')
+        self.assertEqual(state['author'], 'miss')
+        self.assertEqual(state['dogs'], 'hit')
+
+        self.cache_state()
+        author.save(update_fields=['last_login'])
+        self.assertEqual(set(self.cache_state().values()), {'hit'})
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_cache_filled_from_primary(self):
+        def database(request):
+            return HttpResponse(Post.objects.all().db)
+
+        view = page_cache.cache_page(page_cache.INDEX_TAG)(
+            read_from_replica(database)
+        )
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        response = view(request)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertEqual(response.content, b'default')
+
+    @override_settings(PAGE_CACHE_TIMEOUT=60 * 5, PAGE_CACHE_TAG_TIMEOUT=60)
+    def test_tag_versions_expire(self):
+        """Версии тегов случайных адресов (404) не живут вечно."""
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            response = self.guest_client.get(
+                reverse('posts:profile', args=('nobody',))
+            )
+        self.assertEqual(response.status_code, 404)
+        add.assert_called_once_with(
+            page_cache.TAG_KEY.format(tag='author:nobody'), mock.ANY,
+            timeout=2 * 60 * 5,
+        )
+        with mock.patch.object(cache, 'set_many') as set_many:
+            page_cache.invalidate(page_cache.INDEX_TAG)
+        self.assertEqual(set_many.call_args[1]['timeout'], 2 * 60 * 5)
+
+    def test_authorized_user_bypasses_cache(self):
+        client = Client()
+        client.force_login(self.author)
+        client.get(self.urls['index'])
+        response = client.get(self.urls['index'])
+        self.assertNotIn('X-Page-Cache', response)
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Кошечки',
+            slug='cats',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Авторизованному пользователю страницы не кешируются целиком,
+        # поэтому каждая страница заново собирается из карточек
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_card_cached_per_variant(self):
+        self.author_client.get(reverse('posts:index'))
+        self.author_client.get(
+            reverse('posts:group_list', args=(self.group.slug,))
+        )
+        self.assertIn(
+            'все записи группы', cache.get(card_key(self.post, True))
+        )
+        self.assertNotIn(
+            'все записи группы', cache.get(card_key(self.post, False))
+        )
+
+    def test_edited_post_gets_new_card(self):
+        url = reverse('posts:index')
+        self.author_client.get(url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        response = self.author_client.get(url)
+        self.assertContains(response, 'Исправленный текст')
+        self.assertIsNotNone(cache.get(card_key(post, True)))
+
+    def test_renamed_group_and_author_get_new_card(self):
+        url = reverse('posts:index')
+        self.author_client.get(url)
+        Group.objects.filter(pk=self.group.pk).update(
+            slug='kittens', title='Котята'
+        )
+        User.objects.filter(pk=self.author.pk).update(
+            first_name='Ирина', last_name='Д.'
+        )
+        response = self.author_client.get(url)
+        self.assertContains(response, 'все записи группы Котята')
+        self.assertContains(
+            response, reverse('posts:group_list', args=('kittens',))
+        )
+        self.assertContains(response, 'Автор: Ирина Д.')
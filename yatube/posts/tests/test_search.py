@@ -0,0 +1,97 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import jobs
+
+from ..models import Post
+from ..search import get_backend
+from .fixtures import create_author
+
+User = get_user_model()
+
+
+# Поисковый индекс обновляется задачами core.jobs
+@override_settings(JOBS_EAGER=True)
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.cats = Post.objects.create(
+            author=cls.author, text='Котики гуляют по крыше. Котики!'
+        )
+        cls.cat = Post.objects.create(
+            author=cls.author, text='Один котик и собака'
+        )
+        cls.dogs = Post.objects.create(
+            author=cls.author, text='Собаки лают'
+        )
+
+    def search(self, query):
+        response = self.client.get(reverse('posts:search'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [post.id for post in response.context['page_obj']]
+
+    def test_ranked_results(self):
+        """Пост, где слово встречается чаще, выше в выдаче."""
+        self.assertEqual(self.search('котик'), [self.cats.id, self.cat.id])
+        self.assertEqual(self.search('СОБАК'), [self.dogs.id, self.cat.id])
+
+    def test_all_words_required(self):
+        self.assertEqual(self.search('котик собака'), [self.cat.id])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.search('"собака*\' ^('), [self.cat.id])
+        self.assertEqual(self.search('***'), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        post = Post.objects.get(pk=self.dogs.pk)
+        post.text = 'Теперь здесь про кошек'
+        post.save()
+        self.assertEqual(self.search('лают'), [])
+        self.assertEqual(self.search('кошек'), [post.id])
+        post.delete()
+        self.assertEqual(self.search('кошек'), [])
+
+    @override_settings(JOBS_EAGER=False)
+    def test_index_updated_by_job(self):
+        post = Post.objects.create(author=self.author, text='Ёжик в тумане')
+        self.assertEqual(self.search('ёжик'), [])
+        jobs.run_pending()
+        self.assertEqual(self.search('ёжик'), [post.id])
+
+    def test_rebuild_command(self):
+        Post.objects.bulk_create([
+            Post(author=self.author, text='Попугай говорит'),
+        ])
+        self.assertEqual(self.search('попугай'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('попугай')), 1)
+
+    def test_pagination_keeps_query(self):
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Котик номер {i}')
+            for i in range(15)
+        )
+        get_backend().rebuild()
+        response = self.client.get(reverse('posts:search'), {'q': 'котик'})
+        self.assertEqual(response.context['page_obj'].paginator.count, 17)
+        self.assertContains(
+            response, '?q=%D0%BA%D0%BE%D1%82%D0%B8%D0%BA&amp;page=2'
+        )
+
+    def test_admin_search_uses_index(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'котик'}
+        )
+        self.assertEqual(
+            {post.id for post in response.context['cl'].result_list},
+            {self.cats.id, self.cat.id}
+        )
@@ -0,0 +1,262 @@
+import pickle
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..timeline import Entries, for_author, for_group, home
+from .fixtures import create_author, create_group, create_posts
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0, TIMELINE_SIZE=5)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        cls.posts = create_posts(cls.author, 8)
+
+    def setUp(self):
+        home.invalidate()
+
+    def get_page(self, **params):
+        with mock.patch('posts.views.POSTS_COUNT', 2):
+            response = self.client.get(reverse('posts:index'), params)
+        return response.context['page_obj']
+
+    def newest_ids(self):
+        return list(Post.objects.order_by('-pub_date', '-id')
+                    .values_list('id', flat=True))
+
+    def test_timeline_keeps_newest_posts(self):
+        state = home.load()
+        self.assertEqual(
+            [pk for _, pk in reversed(state['entries'])],
+            self.newest_ids()[:5],
+        )
+        self.assertFalse(state['complete'])
+
+        post = Post.objects.create(author=self.author, text='Новый')
+        entries = home.state()['entries']
+        self.assertEqual(entries[-1][1], post.id)
+        self.assertEqual(len(entries), 5)
+
+        post.delete()
+        self.assertNotIn(post.id, [pk for _, pk in home.state()['entries']])
+        self.assertEqual(home.check(), (set(), set()))
+
+    def test_first_page_from_timeline(self):
+        home.load()
+        with mock.patch('posts.views.POSTS_COUNT', 2):
+            with self.assertNumQueries(1):
+                self.client.get(reverse('posts:index'))
+
+    def test_pages_match_database(self):
+        """Страницы из ленты и за её пределами совпадают с БД."""
+        newest = self.newest_ids()
+        seen, page_obj = [], self.get_page()
+        cursors = []
+        while True:
+            seen += [post.id for post in page_obj]
+            if not page_obj.has_next():
+                break
+            cursors.append(page_obj.next_cursor)
+            page_obj = self.get_page(after=page_obj.next_cursor)
+        self.assertEqual(seen, newest)
+
+        page_obj = self.get_page(before=self.get_page(
+            after=cursors[1]
+        ).previous_cursor)
+        self.assertEqual([post.id for post in page_obj], newest[2:4])
+
+        for number in (1, 2, 3, 4):
+            with self.subTest(page=number):
+                page_obj = self.get_page(page=number)
+                self.assertEqual(
+                    [post.id for post in page_obj],
+                    newest[(number - 1) * 2:number * 2],
+                )
+
+    def test_stale_timeline_falls_back_to_database(self):
+        home.load()
+        # Удаляем пост в обход сигналов
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM posts_post WHERE id = %s', [self.newest_ids()[0]]
+            )
+        page_obj = self.get_page()
+        self.assertEqual(
+            [post.id for post in page_obj], self.newest_ids()[:2]
+        )
+        self.assertIsNone(cache.get(home.key))
+
+    def test_posts_missing_on_replica_come_from_primary(self):
+        home.load()
+        newest = self.newest_ids()
+        entries = home.state()['entries'][-2:][::-1]
+        in_bulk = QuerySet.in_bulk
+        calls = []
+
+        def lagging(queryset, ids):
+            # Первый запрос идёт на реплику без самого нового поста
+            calls.append(ids)
+            posts = in_bulk(queryset, ids)
+            if len(calls) == 1:
+                del posts[newest[0]]
+            return posts
+
+        with mock.patch.object(QuerySet, 'in_bulk', lagging):
+            posts = home.hydrate(entries, Post.objects.all())
+        self.assertEqual(calls, [newest[:2], newest[:1]])
+        self.assertEqual([post.id for post in posts], newest[:2])
+        self.assertIsNotNone(cache.get(home.key))
+
+    def test_locked_timeline(self):
+        home.load()
+        post = Post.objects.create(author=self.author, text='Новый')
+        with home.locked() as locked, \
+                mock.patch('posts.timeline.LOCK_TIMEOUT', 0.05):
+            self.assertTrue(locked)
+            # Список меняет другой поток: читатель его не сохраняет,
+            # а писатель, не дождавшись блокировки, сбрасывает
+            home.invalidate()
+            self.assertEqual(home.state()['entries'][-1][1], post.id)
+            self.assertIsNone(cache.get(home.key))
+            cache.set(home.key, home.load(wait=False))
+            home.remove(post.id)
+            self.assertIsNone(cache.get(home.key))
+        post.delete()
+        self.assertNotIn(post.id, [pk for _, pk in home.state()['entries']])
+
+    @override_settings(PAGE_CACHE_SHARED=True)
+    def test_check_command(self):
+        with self.assertRaisesMessage(CommandError, 'нет в кеше'):
+            call_command('check_timeline', stdout=StringIO())
+        home.load()
+        Post.objects.bulk_create([Post(author=self.author, text='Мимо')])
+        with self.assertRaises(CommandError):
+            call_command('check_timeline', stderr=StringIO())
+        call_command(
+            'check_timeline', fix=True, stdout=StringIO(), stderr=StringIO()
+        )
+        self.assertEqual(home.check(), (set(), set()))
+
+    @override_settings(PAGE_CACHE_SHARED=None)
+    def test_commands_need_shared_cache(self):
+        """С LocMemCache команда видит только свой пустой кеш."""
+        home.load()
+        for command in ('check_timeline', 'rebuild_timeline'):
+            with self.subTest(command=command):
+                with self.assertRaisesMessage(CommandError, 'LocMemCache'):
+                    call_command(command, stdout=StringIO())
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0, SCOPED_TIMELINE_SIZE=3)
+class ScopedTimelineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        cls.other = create_author('other')
+        cls.group = create_group()
+        # Авторы и группа чередуются, чтобы ленты были вперемешку
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author if i % 2 else cls.other,
+                group=cls.group if i % 3 else None,
+                text=f'Пост {i}',
+            )
+            for i in range(9)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.author_timeline = for_author(self.author.pk)
+        self.group_timeline = for_group(self.group.pk)
+
+    def ids(self, timeline):
+        return [pk for _, pk in reversed(timeline.state()['entries'])]
+
+    def newest_ids(self, **lookup):
+        return list(Post.objects.filter(**lookup)
+                    .order_by('-pub_date', '-id')
+                    .values_list('id', flat=True))
+
+    def test_scoped_timelines(self):
+        self.assertEqual(
+            self.ids(self.author_timeline),
+            self.newest_ids(author=self.author)[:3],
+        )
+        self.assertEqual(
+            self.ids(self.group_timeline),
+            self.newest_ids(group=self.group)[:3],
+        )
+
+        post = Post.objects.create(author=self.author, text='Без группы')
+        self.assertEqual(self.ids(self.author_timeline)[0], post.id)
+        self.assertNotIn(post.id, self.ids(self.group_timeline))
+
+        post.group = self.group
+        post.save()
+        self.assertEqual(self.ids(self.group_timeline)[0], post.id)
+        post.group = None
+        post.save()
+        self.assertNotIn(post.id, self.ids(self.group_timeline))
+
+        post.delete()
+        self.assertNotIn(post.id, self.ids(self.author_timeline))
+        self.assertEqual(self.author_timeline.check(), (set(), set()))
+        self.assertEqual(self.group_timeline.check(), (set(), set()))
+
+    def test_post_moved_to_other_author(self):
+        other_timeline = for_author(self.other.pk)
+        self.author_timeline.load()
+        other_timeline.load()
+        post = Post.objects.get(pk=self.newest_ids(author=self.author)[0])
+        post.author = self.other
+        post.save()
+        self.assertNotIn(post.id, self.ids(self.author_timeline))
+        self.assertIn(post.id, self.ids(other_timeline))
+        self.assertEqual(
+            self.ids(other_timeline), self.newest_ids(author=self.other)[:3]
+        )
+        self.assertEqual(self.author_timeline.check(), (set(), set()))
+        self.assertEqual(other_timeline.check(), (set(), set()))
+
+    def test_group_deletion_drops_timeline(self):
+        self.group_timeline.load()
+        Group.objects.get(pk=self.group.pk).delete()
+        self.assertIsNone(cache.get(self.group_timeline.key))
+
+    def test_pages_from_timeline(self):
+        self.author_timeline.load()
+        self.group_timeline.load()
+        pages = {
+            reverse('posts:profile', args=('auth',)): self.author_timeline,
+            reverse('posts:group_list', args=('cats',)): self.group_timeline,
+        }
+        for url, timeline in pages.items():
+            with self.subTest(url=url):
+                with mock.patch('posts.views.POSTS_COUNT', 2):
+                    # автор или группа и посты страницы одним in_bulk
+                    with self.assertNumQueries(2) as context:
+                        response = self.client.get(url)
+                posts_query = context.captured_queries[-1]['sql']
+                self.assertNotIn('ORDER BY', posts_query)
+                self.assertEqual(
+                    [post.id for post in response.context['page_obj']],
+                    self.ids(timeline)[:2],
+                )
+
+    def test_entries_are_compact(self):
+        entries = Entries((i, i) for i in range(1000))
+        self.assertLess(len(pickle.dumps(entries)), 16 * 1000 + 200)
+        self.assertEqual(pickle.loads(pickle.dumps(entries))[:2],
+                         [(0, 0), (1, 1)])
+        self.assertEqual(entries.position((5, 5)), 5)
+        self.assertEqual(entries.position((5, 5), right=True), 6)
+        self.assertFalse(entries.insert((5, 5)))
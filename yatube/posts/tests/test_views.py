@@ -1,8 +1,11 @@
+from unittest import mock
+
 from django import forms
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from .. import timeline
 from ..models import Group, Post
 from ..views import POSTS_COUNT
 
@@ -141,6 +144,43 @@ class PostPagesTests(TestCase):
             response.context['page_obj'].object_list, self.group_dog.id
         )
 
+    def test_index_keyset_pages(self):
+        """Курсорные страницы совпадают со страницами по номеру."""
+        url = reverse('posts:index')
+        first_page = self.ira_client.get(url).context['page_obj']
+        self.assertTrue(first_page.has_next())
+        self.assertFalse(first_page.has_previous())
+
+        response = self.ira_client.get(
+            url, {'after': first_page.next_cursor}
+        )
+        next_page = response.context['page_obj']
+        numbered_page = self.ira_client.get(
+            url, {'page': 2}
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in next_page],
+            [post.id for post in numbered_page],
+        )
+        self.assertTrue(next_page.has_previous())
+        self.assertContains(response, f'?before={next_page.previous_cursor}')
+
+        previous_page = self.ira_client.get(
+            url, {'before': next_page.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in previous_page],
+            [post.id for post in first_page],
+        )
+
+    def test_index_invalid_cursor(self):
+        """Некорректный курсор ведёт на первую страницу."""
+        response = self.ira_client.get(
+            reverse('posts:index'), {'after': 'broken'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].number, 1)
+
     def check_posts_group(self, posts, expected_group_id):
         for obj in posts:
             self.assertIsNotNone(obj.group)
@@ -247,3 +287,112 @@ class PostPagesTests(TestCase):
             object_found,
             f'Object with id {check_object_id} has not been found'
         )
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class FeedQueriesTest(TestCase):
+    """Число запросов ленты не зависит от числа постов на странице."""
+
+    # Главная: id постов из материализованной ленты, один in_bulk.
+    # Группа и профиль: ещё запрос за группой/автором,
+    # число постов берётся из счётчиков, без COUNT(*).
+    FEED_QUERIES = {
+        'posts:index': 1,
+        'posts:group_list': 2,
+        'posts:profile': 2,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(3)
+        ]
+        for i in range(POSTS_COUNT * 2):
+            Post.objects.create(
+                author=cls.authors[0] if i % 2 else cls.authors[i % 3],
+                text=f'Пост {i}',
+                group=cls.group if i % 2 else None,
+            )
+        cls.urls = {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}
+            ),
+            'posts:profile': reverse(
+                'posts:profile',
+                kwargs={'username': cls.authors[0].username}
+            ),
+        }
+
+    def test_post_detail_query_count(self):
+        """Пост, автор, группа и число постов автора - одним запросом."""
+        post = Post.objects.filter(group=self.group).first()
+        url = reverse('posts:post_detail', kwargs={'post_id': post.id})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(
+            response.context['post_count'],
+            Post.objects.filter(author=post.author).count()
+        )
+
+    def test_feed_query_count(self):
+        # Материализованные ленты строятся один раз, при первом обращении
+        timeline.home.load()
+        timeline.for_group(self.group.pk).load()
+        timeline.for_author(self.authors[0].pk).load()
+        for per_page in (1, POSTS_COUNT, POSTS_COUNT * 2):
+            for name, queries in self.FEED_QUERIES.items():
+                with self.subTest(view=name, per_page=per_page):
+                    with mock.patch('posts.views.POSTS_COUNT', per_page):
+                        with self.assertNumQueries(queries):
+                            self.client.get(self.urls[name])
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class PaginatorNavigationTest(TestCase):
+    """Навигация по номерам страниц не растёт вместе с лентой."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(author=self.author, text='Тестовый пост')
+            for _ in range(count)
+        )
+        # bulk_create обходит сигналы, которые ведут ленту главной
+        timeline.home.invalidate()
+
+    def get_page(self, number):
+        with mock.patch('posts.views.POSTS_COUNT', 1):
+            return self.client.get(reverse('posts:index'), {'page': number})
+
+    def test_elided_page_range(self):
+        self.create_posts(100)
+        page_obj = self.get_page(50).context['page_obj']
+        self.assertEqual(
+            page_obj.elided_page_range,
+            [1, '…', 47, 48, 49, 50, 51, 52, 53, '…', 100]
+        )
+        page_obj = self.get_page(2).context['page_obj']
+        self.assertEqual(
+            page_obj.elided_page_range,
+            [1, 2, 3, 4, 5, '…', 100]
+        )
+
+    def test_response_size_bounded(self):
+        self.create_posts(50)
+        small = len(self.get_page(20).content)
+        self.create_posts(950)
+        large = len(self.get_page(20).content)
+        # Отличаться может только разрядность номера последней страницы
+        self.assertLess(large - small, 50)
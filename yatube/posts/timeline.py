@@ -0,0 +1,400 @@
+"""Материализованные ленты: главная, авторов и групп.
+
+В кеше хранится отсортированный список (pub_date в мкс, id) самых
+новых постов ленты - два массива array('q'), по 16 байт на пост.
+Сигналы Post дописывают в него новые посты и убирают удалённые, так
+что лента берёт id страницы по позиции в списке и выбирает посты
+одним in_bulk, не сортируя таблицу постов. Если кеша нет, список
+строится заново одним запросом по индексу ленты.
+
+Список всегда содержит непрерывное начало ленты: новые посты
+добавляются в начало, лишние обрезаются с конца, удаление поста
+лишь укорачивает список. Флаг complete означает, что в списке
+вся лента целиком.
+
+Лента главной одна и длинная (TIMELINE_SIZE), ленты авторов и
+групп короче (SCOPED_TIMELINE_SIZE) и строятся при первом обращении;
+память под них ограничивает сам кеш.
+
+Список строится и сверяется только по основной базе: реплика может
+отставать, и построенный по ней список потерял бы новые посты.
+Изменения списка идут под блокировкой в кеше (cache.add), а запись
+в кеше живёт TIMELINE_TIMEOUT секунд, так что любое расхождение
+со временем исправляется перестройкой.
+"""
+import time
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import Group, Post
+from .paginator import FEED_ORDERING, KeysetPage, KeysetPaginator
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+DEFAULT_TIMEOUT = 60 * 60
+# Сколько секунд живёт блокировка списка, если её владелец упал
+LOCK_TIMEOUT = 5
+
+
+def timestamp(pub_date):
+    """Дата публикации в целых микросекундах (без ошибок float)."""
+    return (pub_date - EPOCH) // MICROSECOND
+
+
+class StaleTimeline(Exception):
+    """Список расходится с таблицей постов."""
+
+
+class Entries:
+    """Пары (мкс, id) по возрастанию в двух массивах array('q').
+
+    Ведёт себя как список пар: len, индексы и срезы (срез - list).
+    """
+
+    __slots__ = ('micros', 'ids')
+
+    def __init__(self, pairs=()):
+        self.micros = array('q')
+        self.ids = array('q')
+        for micros, pk in pairs:
+            self.micros.append(micros)
+            self.ids.append(pk)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.micros[index], self.ids[index]))
+        return self.micros[index], self.ids[index]
+
+    def __iter__(self):
+        return zip(self.micros, self.ids)
+
+    def __getstate__(self):
+        return self.micros, self.ids
+
+    def __setstate__(self, state):
+        self.micros, self.ids = state
+
+    def position(self, entry, right=False):
+        """Место entry в списке, как у bisect_left/bisect_right."""
+        micros, pk = entry
+        low = bisect_left(self.micros, micros)
+        high = bisect_right(self.micros, micros, low)
+        return (bisect_right if right else bisect_left)(
+            self.ids, pk, low, high
+        )
+
+    def insert(self, entry):
+        """Вставляет пару на её место; False, если она уже есть."""
+        position = self.position(entry)
+        if position < len(self) and self[position] == entry:
+            return False
+        self.micros.insert(position, entry[0])
+        self.ids.insert(position, entry[1])
+        return True
+
+    def remove(self, pk):
+        """Убирает пост pk; False, если его в списке не было."""
+        try:
+            position = self.ids.index(pk)
+        except ValueError:
+            return False
+        del self.micros[position]
+        del self.ids[position]
+        return True
+
+    def trim(self, size):
+        """Оставляет size самых новых записей."""
+        extra = len(self) - size
+        if extra > 0:
+            del self.micros[:extra]
+            del self.ids[:extra]
+        return extra > 0
+
+
+class Timeline:
+    KEY = 'timeline:{scope}'
+    LOCK_KEY = 'timeline:{scope}:lock'
+    SIZE_SETTING = 'TIMELINE_SIZE'
+    DEFAULT_SIZE = 1000
+
+    def __init__(self, scope, **lookup):
+        self.key = self.KEY.format(scope=scope)
+        self.lock_key = self.LOCK_KEY.format(scope=scope)
+        self.lookup = lookup
+
+    @property
+    def size(self):
+        return getattr(settings, self.SIZE_SETTING, self.DEFAULT_SIZE)
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'TIMELINE_TIMEOUT', DEFAULT_TIMEOUT)
+
+    def queryset(self):
+        """Посты ленты в порядке FEED_ORDERING из основной базы."""
+        return (
+            Post.objects.using(DEFAULT_DB_ALIAS)
+            .filter(**self.lookup).order_by(*FEED_ORDERING)
+        )
+
+    @contextmanager
+    def locked(self, wait=True):
+        """Блокировка списка; внутри - True, если её удалось взять.
+
+        Без wait не ждёт; с wait ждёт не дольше LOCK_TIMEOUT, за это
+        время блокировка упавшего владельца истекает.
+        """
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        locked = cache.add(self.lock_key, token, LOCK_TIMEOUT)
+        while not locked and wait and time.monotonic() < deadline:
+            time.sleep(0.01)
+            locked = cache.add(self.lock_key, token, LOCK_TIMEOUT)
+        try:
+            yield locked
+        finally:
+            if locked and cache.get(self.lock_key) == token:
+                cache.delete(self.lock_key)
+
+    def load(self, wait=True):
+        """Строит список по таблице постов и сохраняет в кеш.
+
+        Если блокировку взять не удалось, список возвращается,
+        но не сохраняется: его строит или меняет другой поток.
+        """
+        with self.locked(wait) as locked:
+            rows = list(
+                self.queryset().values_list('pub_date', 'id')[:self.size + 1]
+            )
+            state = {
+                'entries': Entries(sorted(
+                    (timestamp(pub_date), pk)
+                    for pub_date, pk in rows[:self.size]
+                )),
+                'complete': len(rows) <= self.size,
+            }
+            if locked:
+                cache.set(self.key, state, self.timeout)
+        return state
+
+    def state(self):
+        """{'entries': Entries, 'complete': bool}."""
+        state = cache.get(self.key)
+        if state is None or (
+            # удаления сильно укоротили список - строим заново
+            not state['complete'] and len(state['entries']) < self.size // 2
+        ):
+            state = self.load(wait=False)
+        return state
+
+    def invalidate(self):
+        cache.delete(self.key)
+
+    def _update(self, change, *args):
+        with self.locked() as locked:
+            if not locked:
+                # Не дождались блокировки - пусть список построят заново
+                self.invalidate()
+                return
+            state = cache.get(self.key)
+            if state is not None and change(state, *args):
+                cache.set(self.key, state, self.timeout)
+
+    def _apply(self, change, *args):
+        self._update(change, *args)
+        if transaction.get_connection().in_atomic_block:
+            # Список, построенный параллельно до коммита, этой правки
+            # не видел - повторяем её после коммита (правки идемпотентны)
+            transaction.on_commit(partial(self._update, change, *args))
+
+    def _insert(self, state, entry):
+        entries = state['entries']
+        if entries and not state['complete'] and entry < entries[0]:
+            # Пост старше начала ленты в списке - он за его пределами
+            return False
+        if not entries.insert(entry):
+            return False
+        if entries.trim(self.size):
+            state['complete'] = False
+        return True
+
+    @staticmethod
+    def _remove(state, post_id):
+        return state['entries'].remove(post_id)
+
+    def add(self, post):
+        self._apply(self._insert, (timestamp(post.pub_date), post.pk))
+
+    def remove(self, post_id):
+        self._apply(self._remove, post_id)
+
+    def hydrate(self, entries, queryset):
+        """Посты для записей списка в том же порядке, одним in_bulk.
+
+        Посты, которых нет в базе queryset (реплика отстаёт), добираются
+        из основной базы. Если поста нет и там или дата не совпадает,
+        список устарел: он сбрасывается и выбрасывается StaleTimeline.
+        """
+        ids = [pk for _, pk in entries]
+        posts = queryset.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in posts]
+        if missing:
+            posts.update(queryset.using(DEFAULT_DB_ALIAS).in_bulk(missing))
+        result = []
+        for micros, pk in entries:
+            post = posts.get(pk)
+            if post is None or timestamp(post.pub_date) != micros:
+                self.invalidate()
+                raise StaleTimeline(self.key)
+            result.append(post)
+        return result
+
+    def check(self):
+        """Сравнивает список с таблицей постов.
+
+        Возвращает (лишние, недостающие) записи; пустые множества -
+        список согласован. Если списка в кеше нет, сверять нечего:
+        возвращается None.
+        """
+        state = cache.get(self.key)
+        if state is None:
+            return None
+        entries = set(state['entries'])
+        rows = self.queryset().values_list('pub_date', 'id')
+        if not state['complete']:
+            rows = rows[:len(entries)]
+        expected = {(timestamp(pub_date), pk) for pub_date, pk in rows}
+        return entries - expected, expected - entries
+
+
+class ScopedTimeline(Timeline):
+    """Лента одного автора или одной группы."""
+
+    SIZE_SETTING = 'SCOPED_TIMELINE_SIZE'
+    DEFAULT_SIZE = 200
+
+
+def for_author(author_id):
+    return ScopedTimeline(f'author:{author_id}', author_id=author_id)
+
+
+def for_group(group_id):
+    return ScopedTimeline(f'group:{group_id}', group_id=group_id)
+
+
+def for_post(post):
+    """Все ленты, в которые попадает пост."""
+    timelines = [home, for_author(post.author_id)]
+    if post.group_id is not None:
+        timelines.append(for_group(post.group_id))
+    return timelines
+
+
+def by_name(author=None, group=None):
+    """Лента автора по username, группы по slug, иначе главная."""
+    if author:
+        return for_author(get_user_model().objects.get(username=author).pk)
+    if group:
+        return for_group(Group.objects.get(slug=group).pk)
+    return home
+
+
+def invalidate_scopes(author_ids=(), group_ids=()):
+    """Сбрасывает ленты авторов и групп после массовой записи."""
+    cache.delete_many(
+        [for_author(pk).key for pk in author_ids]
+        + [for_group(pk).key for pk in group_ids if pk is not None]
+    )
+
+
+class TimelinePaginator(KeysetPaginator):
+    """KeysetPaginator, который берёт id страниц из Timeline.
+
+    Страницы за пределами списка и страницы, для которых список
+    оказался устаревшим, выбираются из БД как обычно.
+    """
+
+    def __init__(self, object_list, per_page, timeline, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.timeline = timeline
+        state = timeline.state()
+        self.entries = state['entries']
+        self.complete = state['complete']
+
+    def _posts(self, entries):
+        return self.timeline.hydrate(entries, self.object_list)
+
+    def _first_page(self):
+        entries = self.entries
+        if len(entries) < self.per_page and not self.complete:
+            return super()._first_page()
+        try:
+            posts = self._posts(entries[-self.per_page:][::-1])
+        except StaleTimeline:
+            return super()._first_page()
+        return KeysetPage(
+            posts, 1, self,
+            has_next=len(entries) > self.per_page or not self.complete,
+        )
+
+    def _page_after(self, pub_date, pk):
+        position = self.entries.position((timestamp(pub_date), pk))
+        if position <= self.per_page and not self.complete:
+            return super()._page_after(pub_date, pk)
+        rows = self.entries[max(0, position - self.per_page - 1):position]
+        try:
+            posts = self._posts(rows[::-1][:self.per_page])
+        except StaleTimeline:
+            return super()._page_after(pub_date, pk)
+        return KeysetPage(
+            posts, None, self,
+            has_next=len(rows) > self.per_page,
+            has_previous=True,
+        )
+
+    def _page_before(self, pub_date, pk):
+        key = (timestamp(pub_date), pk)
+        if not self.complete and (not self.entries or key < self.entries[0]):
+            return super()._page_before(pub_date, pk)
+        position = self.entries.position(key, right=True)
+        rows = self.entries[position:position + self.per_page + 1]
+        if len(rows) <= self.per_page:
+            # Дошли до начала ленты - это обычная первая страница.
+            return self._first_page()
+        try:
+            posts = self._posts(rows[:self.per_page][::-1])
+        except StaleTimeline:
+            return super()._page_before(pub_date, pk)
+        return KeysetPage(posts, None, self, has_next=True, has_previous=True)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        total = len(self.entries)
+        if top > total and not self.complete:
+            return super().page(number)
+        try:
+            posts = self._posts(
+                self.entries[max(0, total - top):total - bottom][::-1]
+            )
+        except StaleTimeline:
+            return super().page(number)
+        return self._get_page(posts, number, self)
+
+
+home = Timeline('index')
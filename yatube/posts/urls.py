@@ -1,15 +1,26 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'posts'
 
+# Под ASGI страницы только для чтения - асинхронные
+read_views = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('group/<slug:slug>/', views.group_posts, name='group_list'),
-    path('profile/<str:username>/', views.profile, name='profile'),
+    path('', read_views.index, name='index'),
+    path('group/<slug:slug>/', read_views.group_posts, name='group_list'),
+    path('profile/<str:username>/', read_views.profile, name='profile'),
+    path('search/', views.search, name='search'),
+    path(
+        'autocomplete/', views.autocomplete_lookup, name='autocomplete'
+    ),
+    path('export/', views.export_posts, name='export'),
     # Просмотр записи
-    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/', read_views.post_detail, name='post_detail'
+    ),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
 ]
@@ -1,11 +1,26 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import (HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.http import urlencode
 
+from core.db import read_from_replica
+
+from . import autocomplete, timeline
+from .conditional import (conditional_page, not_modified, set_validators,
+                          validators)
+from .counters import author_post_count
+from .exporter import CONTENT_TYPES, export_lines, filter_posts, parse_bound
 from .forms import PostForm
 from .models import Group, Post
+from .page_cache import AUTHOR_TAG, GROUP_TAG, INDEX_TAG, cache_page
+from .paginator import CountedPaginator, paginate
+from .search import get_backend as get_search_backend
+from .templatetags.post_cards import related_version
+from .timeline import TimelinePaginator
 
 POSTS_COUNT: int = 10
 
@@ -20,16 +35,19 @@ def only_user_view(request):
 """
 
 
+@conditional_page(INDEX_TAG)
+@cache_page(INDEX_TAG)
+@read_from_replica
 def index(request):
-    post_list = Post.objects.select_related('group')
-
-    paginator = Paginator(post_list, POSTS_COUNT)
-
-    # Из URL извлекаем номер запрошенной страницы - это значение параметра page
-    page_number = request.GET.get('page')
-
-    # Получаем набор записей для страницы с запрошенным номером
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.for_feed()
+
+    # Страница выбирается по курсору ?after=/?before=
+    # или, для старых ссылок, по номеру ?page=;
+    # id постов страницы берутся из материализованной ленты
+    page_obj = paginate(
+        request, post_list, POSTS_COUNT,
+        paginator_class=TimelinePaginator, timeline=timeline.home,
+    )
     # Отдаем в словаре контекста
     context = {
         'page_obj': page_obj,
@@ -38,6 +56,9 @@ def index(request):
 
 
 # View-функция для страницы сообщества:
+@conditional_page(GROUP_TAG)
+@cache_page(GROUP_TAG)
+@read_from_replica
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     # Функция get_object_or_404 получает по заданным критериям объект
@@ -46,17 +67,15 @@ def group_posts(request, slug):
     # поле slug у которых соответствует значению slug в запросе
     group = get_object_or_404(Group, slug=slug)
 
-    posts = (
-        group.posts.all()
-    )
-
-    paginator = Paginator(posts, POSTS_COUNT)
-
-    # Из URL извлекаем номер запрошенной страницы - это значение параметра page
-    page_number = request.GET.get('page')
+    posts = group.posts.for_feed()
 
-    # Получаем набор записей для страницы с запрошенным номером
-    page_obj = paginator.get_page(page_number)
+    # Число постов берём из счётчика группы, а не из COUNT(*);
+    # id постов первых страниц - из материализованной ленты группы
+    page_obj = paginate(
+        request, posts, POSTS_COUNT, count=group.post_count,
+        paginator_class=TimelinePaginator,
+        timeline=timeline.for_group(group.pk),
+    )
 
     # В словаре context отправляем информацию в шаблон
     context: dict = {
@@ -67,31 +86,111 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@conditional_page(AUTHOR_TAG)
+@cache_page(AUTHOR_TAG)
+@read_from_replica
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    posts = (
-        user.posts.all()
+    user = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username
     )
+    posts = user.posts.for_feed()
+    post_count = author_post_count(user)
 
-    paginator = Paginator(posts, POSTS_COUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(
+        request, posts, POSTS_COUNT, count=post_count,
+        paginator_class=TimelinePaginator,
+        timeline=timeline.for_author(user.pk),
+    )
 
     context: dict = {
         'author': user,
+        'post_count': post_count,
         'page_obj': page_obj,
     }
     return render(request, 'posts/profile.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    # Найденные посты упорядочены по релевантности, а не по дате,
+    # поэтому листаются по номеру страницы
+    posts = get_search_backend().search(Post.objects.for_feed(), query)
+    paginator = CountedPaginator(posts, POSTS_COUNT)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+def autocomplete_lookup(request):
+    """Подсказки групп и авторов по началу названия или имени."""
+    kind = request.GET.get('kind')
+    results = autocomplete.index.search(
+        request.GET.get('q', ''),
+        kind=kind if kind in autocomplete.KINDS else None,
+    )
+    return JsonResponse({'results': results})
+
+
+@staff_member_required
+def export_posts(request):
+    """Выгрузка постов для аналитики, отдаётся по мере чтения из БД.
+
+    Параметры: format (jsonl или csv), group, author, since, until.
+    """
+    format = request.GET.get('format', 'jsonl')
+    if format not in CONTENT_TYPES:
+        return HttpResponseBadRequest('Неизвестный формат')
+    try:
+        since, until = (
+            parse_bound(request.GET[name]) if request.GET.get(name) else None
+            for name in ('since', 'until')
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    posts = filter_posts(
+        group=request.GET.get('group'),
+        author=request.GET.get('author'),
+        since=since,
+        until=until,
+    )
+    response = StreamingHttpResponse(
+        export_lines(posts, format), content_type=CONTENT_TYPES[format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{format}"'
+    )
+    return response
+
+
+@read_from_replica
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.for_detail(), pk=post_id)
+
+    # Версия страницы: сам пост, имя автора и название группы,
+    # а также тег автора (число его постов) и тег группы - без рендера
+    tags = [AUTHOR_TAG.format(username=post.author.username)]
+    if post.group_id is not None:
+        tags.append(GROUP_TAG.format(slug=post.group.slug))
+    etag, last_modified = validators(
+        request, tags, post.edit_date.timestamp(), related_version(post),
+        modified=post.edit_date,
+    )
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
 
     # код запроса к модели и создание словаря контекста
     context = {
         'post': post,
+        'post_count': author_post_count(post.author),
     }
-    return render(request, 'posts/post_detail.html', context)
+    response = render(request, 'posts/post_detail.html', context)
+    return set_validators(response, etag, last_modified)
 
 
 @login_required
@@ -124,7 +223,7 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.for_detail(), pk=post_id)
     if post.author != request.user:
         return redirect(
             reverse(
@@ -0,0 +1,60 @@
+// Подсказки для полей с атрибутом data-autocomplete-url.
+// data-autocomplete-target - id скрытого поля, куда пишется id варианта;
+// data-autocomplete-navigate - переход на страницу выбранного варианта.
+(function () {
+  'use strict';
+
+  var DELAY_MS = 150;
+
+  function setup(input) {
+    var datalist = document.getElementById(input.getAttribute('list'));
+    var target = document.getElementById(input.dataset.autocompleteTarget);
+    var results = [];
+    var timer = null;
+
+    function chosen() {
+      for (var i = 0; i < results.length; i++) {
+        if (results[i].label === input.value) {
+          return results[i];
+        }
+      }
+      return null;
+    }
+
+    function load() {
+      var url = input.dataset.autocompleteUrl +
+        '?q=' + encodeURIComponent(input.value);
+      if (input.dataset.autocompleteKind) {
+        url += '&kind=' + input.dataset.autocompleteKind;
+      }
+      fetch(url)
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          results = data.results;
+          datalist.innerHTML = '';
+          results.forEach(function (result) {
+            var option = document.createElement('option');
+            option.value = result.label;
+            datalist.appendChild(option);
+          });
+        });
+    }
+
+    input.addEventListener('input', function () {
+      var result = chosen();
+      if (target) {
+        target.value = result ? result.id : '';
+      }
+      if (result && input.dataset.autocompleteNavigate !== undefined) {
+        window.location = result.url;
+        return;
+      }
+      clearTimeout(timer);
+      timer = setTimeout(load, DELAY_MS);
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('[data-autocomplete-url]').forEach(setup);
+  });
+})();
@@ -0,0 +1,27 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Run it with an ASGI server, e.g. ``uvicorn yatube.asgi:application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
+"""
+
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+# Страницы только для чтения обслуживают асинхронные view
+os.environ.setdefault('YATUBE_ASYNC_VIEWS', '1')
+
+# То же, что get_asgi_application(), но с обработчиком, который
+# читает потоковые ответы (выгрузку постов) вне цикла событий
+django.setup(set_prefix=False)
+
+from core.server import ASGIHandler, prepare  # noqa: E402
+
+application = ASGIHandler()
+
+prepare()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -20,7 +21,11 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 EMPTY_VALUE = '-пусто-'
 
 #  подключаем движок filebased.EmailBackend
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+#  через очередь фоновых задач (core.mail): письма уходят пачками
+#  по EMAIL_BATCH_SIZE, по одному соединению на пачку
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BATCH_SIZE = 100
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
@@ -53,9 +58,12 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'benchmarks.apps.BenchmarksConfig',
 ]
 
 MIDDLEWARE = [
+    # Замеры времени и SQL-запросов; стоит первым, чтобы учесть всё
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,19 +71,35 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
+# Асинхронные варианты лент, поста и страниц about (включает asgi.py);
+# синхронный view выполняется в пуле из ASYNC_VIEW_THREADS потоков
+ASYNC_VIEWS = os.environ.get('YATUBE_ASYNC_VIEWS') == '1'
+ASYNC_VIEW_THREADS = 32
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # Шаблон разбирается один раз на процесс; при старте WSGI-процесса
+    # шаблоны проекта разбираются заранее (core.template_warmup)
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -93,12 +117,132 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Путь к базе можно заменить переменной YATUBE_DB_NAME
+# (так bench_servers запускает серверы на базе замера)
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.environ.get(
+            'YATUBE_DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+    }
+}
+
+# Тип первичного ключа моделей без явного pk: как в существующих таблицах
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+# Прагмы для каждого нового соединения с SQLite (core.db)
+SQLITE_PRAGMAS = {}
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # в WAL fsync только при чекпоинте, база при сбое не портится
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # отрицательное значение - размер кеша страниц в КиБ
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+# Профиль базы выбирается переменной окружения YATUBE_DB_PROFILE.
+# production: постоянные соединения и WAL, в котором запись поста
+# не блокирует чтение лент.
+DATABASE_PROFILE = os.environ.get('YATUBE_DB_PROFILE', 'development')
+if DATABASE_PROFILE == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': int(os.environ.get('YATUBE_CONN_MAX_AGE', 600)),
+        # секунды ожидания блокировки на уровне драйвера sqlite3
+        'OPTIONS': {'timeout': 5},
+    })
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+
+# Реплики только для чтения: пути к копиям базы SQLite через запятую
+# в YATUBE_DB_REPLICAS. Копии обновляет команда sync_replicas.
+# Ленты и страница поста читают со случайной реплики (core.db).
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.environ.get('YATUBE_DB_REPLICAS', '').split(',')),
+    start=1,
+):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'NAME': name.strip(),
+        # в тестах реплика - та же тестовая база
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+# Сколько секунд после записи пользователь читает из основной базы
+REPLICA_PIN_SECONDS = 10
+
+# Кеш страниц (posts.page_cache), ленты и ETag хранят версии в кеше,
+# поэтому с несколькими процессами сайта нужен общий бэкенд (Redis,
+# Memcached): LocMemCache у каждого процесса свой и годится только
+# для одного процесса (runserver, uvicorn без --workers)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # Карточки постов и ленты авторов и групп не умещаются
+        # в 300 записей по умолчанию и вытесняли бы друг друга
+        'OPTIONS': {'MAX_ENTRIES': 20000},
     }
 }
+# Общие ли версии тегов кеша страниц для всех процессов сайта: True -
+# сайт работает одним процессом или с общим кешем, None - решить по
+# бэкенду. Без общих версий ответы 304 не отдаются: страницу мог уже
+# изменить другой процесс
+PAGE_CACHE_SHARED = None
+
+# Время жизни закешированных страниц лент для анонимных посетителей;
+# 0 отключает кеш страниц
+PAGE_CACHE_TIMEOUT = 60 * 5
+# Время жизни версий тегов кеша страниц (не меньше двух
+# PAGE_CACHE_TIMEOUT): версии получают и теги страниц 404
+PAGE_CACHE_TAG_TIMEOUT = 60 * 60 * 24
+# Сколько самых новых постов хранит материализованная лента главной
+# (posts.timeline); страницы дальше выбираются из БД
+TIMELINE_SIZE = 1000
+# То же для лент каждого автора и каждой группы
+SCOPED_TIMELINE_SIZE = 200
+# Время жизни лент в кеше: расхождение с базой (например, после записи
+# в обход сигналов) исправится не позже чем через час
+TIMELINE_TIMEOUT = 60 * 60
+
+# Время жизни отрисованных карточек постов в кеше
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+# Бэкенд полнотекстового поиска по постам: SQLiteFTSBackend (FTS5),
+# PostgresSearchBackend (tsvector) или LikeSearchBackend без индекса
+POST_SEARCH_BACKEND = 'posts.search.SQLiteFTSBackend'
+
+# Индекс автодополнения групп и авторов живёт в памяти процесса;
+# раз в столько секунд он перестраивается в фоновом потоке, чтобы
+# увидеть изменения, сделанные другими процессами
+AUTOCOMPLETE_REBUILD_SECONDS = 60 * 10
+
+# Скользящее окно замеров InstrumentationMiddleware на каждый view;
+# заголовок Server-Timing видят только сотрудники (и все при DEBUG)
+REQUEST_STATS_WINDOW = 1000
+# Каждые REQUEST_STATS_FLUSH_EVERY запросов фоновый поток сохраняет
+# окно процесса в REQUEST_STATS_DIR, откуда его читает request_stats
+REQUEST_STATS_FLUSH_EVERY = 100
+REQUEST_STATS_DIR = os.path.join(
+    tempfile.gettempdir(), 'yatube_request_stats'
+)
+
+# Фоновые задачи (core.jobs): рабочие потоки процесса, размер очереди
+# в памяти, число попыток и пауза перед первым повтором (секунды,
+# удваивается с каждой попыткой). Раз в JOB_POLL_INTERVAL секунд
+# потоки ищут в таблице задачи, не попавшие в очередь, а задачи,
+# зависшие дольше JOB_TIMEOUT секунд, возвращают в работу
+JOB_WORKERS = 2
+JOB_QUEUE_SIZE = 1000
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 5
+JOB_POLL_INTERVAL = 5
+JOB_TIMEOUT = 60 * 10
+# True - задачи выполняются сразу, в потоке запроса (для тестов)
+JOBS_EAGER = False
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators